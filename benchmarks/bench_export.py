@@ -0,0 +1,109 @@
+"""测量各类对象单次导出的耗时, 以及导出含有大量字幕的草稿的耗时
+
+用法: python benchmarks/bench_export.py [字幕数量] [--baseline 版本], 默认为100000条字幕.
+指定`--baseline`时将以`git archive`导出给定版本(如`HEAD~1`)的代码, 并与当前代码对比
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import tarfile
+import tempfile
+import subprocess
+
+from typing import Callable, Optional, Dict, Any
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def per_call(func: Callable[[], Any], number: int = 20000) -> float:
+    """返回多轮测量中单次调用的最短耗时, 单位为微秒"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+def bench_objects() -> Dict[str, float]:
+    """返回各类对象单次导出的耗时, 单位为微秒"""
+    import pyJianYingDraft as draft
+    from pyJianYingDraft.keyframe import Keyframe
+
+    asset_dir = os.path.join(ROOT, "readme_assets", "tutorial")
+    audio = draft.Audio_material(os.path.join(asset_dir, "audio.mp3"))
+    keyframe = Keyframe(0, 1.0)
+    text_seg = draft.Text_segment("字幕内容", draft.Timerange(0, 1000000), style=draft.Text_style(size=5, align=1),
+                                  border=draft.Text_border())
+
+    return {name: per_call(func) for name, func in [("Keyframe.export_json", keyframe.export_json),
+                                                    ("Audio_material.export_json", audio.export_json),
+                                                    ("Text_segment.export_json", text_seg.export_json),
+                                                    ("Text_segment.export_material", text_seg.export_material)]}
+
+def bench_subtitles(count: int) -> float:
+    """返回导出含有`count`条字幕的草稿的耗时, 单位为秒"""
+    import pyJianYingDraft as draft
+
+    script = draft.Script_file(1080, 1920)
+    script.add_track(draft.Track_type.text)
+    style = draft.Text_style(size=5, align=1)
+    segments = [draft.Text_segment("第%d条字幕" % i, draft.Timerange(i * 1000000, 1000000), style=style)
+                for i in range(count)]
+    if hasattr(script, "add_segments"):
+        script.add_segments(segments)
+    else:  # 没有批量添加接口的旧版本
+        for segment in segments:
+            script.add_segment(segment)
+
+    start = time.perf_counter()
+    script.dumps()
+    return time.perf_counter() - start
+
+def run(count: int) -> Dict[str, float]:
+    """在当前导入路径下的`pyJianYingDraft`上进行全部测量"""
+    results = bench_objects()
+    results["dumps(%d)" % count] = bench_subtitles(count)
+    return results
+
+def run_baseline(revision: str, count: int) -> Dict[str, float]:
+    """导出给定版本的代码, 并在子进程中对其进行测量"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = subprocess.run(["git", "archive", revision, "pyJianYingDraft"],
+                                 cwd=ROOT, check=True, stdout=subprocess.PIPE).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tmp_dir)
+        output = subprocess.run([sys.executable, __file__, str(count), "--json", "--root", tmp_dir],
+                                check=True, stdout=subprocess.PIPE).stdout
+        return json.loads(output)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("count", type=int, nargs="?", default=100000)
+    parser.add_argument("--baseline", help="用于对比的git版本")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--root", default=ROOT, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.root)
+    results = run(args.count)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    baseline: Optional[Dict[str, float]] = None
+    if args.baseline is not None:
+        baseline = run_baseline(args.baseline, args.count)
+
+    print("单次导出耗时(μs), 及导出含%d条字幕的草稿的耗时(s):" % args.count)
+    if baseline is None:
+        print("  %-30s %12s" % ("item", "time"))
+    else:
+        print("  %-30s %12s %12s %8s" % ("item", args.baseline, "current", "speedup"))
+    for name, current in results.items():
+        if baseline is None:
+            print("  %-30s %12.2f" % (name, current))
+        else:
+            before = baseline[name]
+            print("  %-30s %12.2f %12.2f %7.2fx" % (name, before, current, before / current))
+
+if __name__ == "__main__":
+    main()
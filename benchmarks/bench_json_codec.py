@@ -0,0 +1,89 @@
+"""比较各JSON编解码后端读写大型草稿的吞吐量
+
+用法: python benchmarks/bench_json_codec.py [草稿文件(draft_content.json)...],
+不指定文件时生成一个含有大量视频片段(带关键帧)及文本片段的草稿
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pyJianYingDraft as draft  # noqa: E402
+from pyJianYingDraft import json_codec  # noqa: E402
+
+def build_draft(path: str, segment_count: int = 5000) -> None:
+    """生成一个大型草稿并保存至指定路径"""
+    asset_dir = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+    script = draft.Script_file(1920, 1080)
+    script.add_track(draft.Track_type.video).add_track(draft.Track_type.text)
+    video = draft.Video_material(os.path.join(asset_dir, "video.mp4"))
+    script.add_material(video)
+
+    video_segments, text_segments = [], []
+    for i in range(segment_count):
+        t_range = draft.Timerange(i * 1000000, 1000000)
+        seg = draft.Video_segment(video, t_range)
+        seg.add_keyframe(draft.Keyframe_property.alpha, 0, 0.0)
+        seg.add_keyframe(draft.Keyframe_property.alpha, 500000, 1.0)
+        video_segments.append(seg)
+        text_segments.append(draft.Text_segment("字幕%d" % i, t_range))
+    script.add_segments(video_segments).add_segments(text_segments)
+
+    json_codec.set_json_codec("stdlib")
+    script.dump(path)
+
+def best_of(func, repeat: int) -> float:
+    """返回多次调用中的最短耗时, 单位为秒"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_file(path: str, repeat: int = 3) -> None:
+    """分别测量各后端解析/编码JSON文本本身, 以及完整加载/保存草稿的吞吐量"""
+    with open(path, "rb") as f:
+        data = f.read()
+    size_mb = len(data) / 1e6
+    print("%s (%.1f MB), 单位为MB/s" % (path, size_mb))
+    print("  %-8s %10s %10s %14s %10s %10s" % ("backend", "decode", "encode", "load_template", "dump", "compact"))
+
+    out_path = path + ".bench.json"
+    for name in json_codec._CODECS:
+        try:
+            json_codec.set_json_codec(name)
+        except ImportError:
+            print("  %-8s (未安装)" % name)
+            continue
+        codec = json_codec.get_json_codec()
+        content = codec.loads(data)
+        script = draft.Script_file.load_template(path)
+        results = [
+            best_of(lambda: codec.loads(data), repeat),
+            best_of(lambda: codec.dumps(content), repeat),
+            best_of(lambda: draft.Script_file.load_template(path), repeat),
+            best_of(lambda: script.dump(out_path), repeat),
+            best_of(lambda: script.dump(out_path, indent=None), repeat),
+        ]
+        print("  %-8s %10.1f %10.1f %14.1f %10.1f %10.1f" % (name, *(size_mb / t for t in results)))
+    os.remove(out_path)
+    json_codec.set_json_codec(None)
+
+def main() -> None:
+    paths = sys.argv[1:]
+    if len(paths) > 0:
+        for path in paths:
+            bench_file(path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "draft_content.json")
+        build_draft(path)
+        bench_file(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""测量时间线上各类对象(片段、关键帧等)每个实例的内存占用
+
+用法: python benchmarks/bench_object_memory.py [对象数量] [--baseline 版本],
+默认创建100000个对象. 指定`--baseline`时将以`git archive`导出给定版本(如`HEAD~1`)的代码, 并与当前代码对比
+"""
+
+import io
+import os
+import sys
+import gc
+import json
+import argparse
+import tarfile
+import tempfile
+import subprocess
+import tracemalloc
+
+from typing import Callable, Optional, Dict, Any
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def measure(build: Callable[[], Any], count: int) -> float:
+    """返回以`build`创建含有`count`个对象的结构后, 平均每个对象常驻的字节数"""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return current / count
+
+def build_keyframe_list(count: int) -> Any:
+    """创建含有`count`个关键帧的关键帧列表, 没有批量添加接口的旧版本中直接填充其`keyframes`列表"""
+    from pyJianYingDraft.keyframe import Keyframe, Keyframe_list, Keyframe_property
+
+    kf_list = Keyframe_list(Keyframe_property.alpha)
+    if hasattr(kf_list, "add_keyframes"):
+        kf_list.add_keyframes(range(count), [1.0] * count)
+    else:
+        kf_list.keyframes.extend(Keyframe(i, 1.0) for i in range(count))
+    return kf_list
+
+def run(count: int) -> Dict[str, float]:
+    """在当前导入路径下的`pyJianYingDraft`上测量各类对象"""
+    import pyJianYingDraft as draft
+
+    asset_dir = os.path.join(ROOT, "readme_assets", "tutorial")
+    video = draft.Video_material(os.path.join(asset_dir, "video.mp4"))
+    audio = draft.Audio_material(os.path.join(asset_dir, "audio.mp3"))
+    style = draft.Text_style(size=5, align=1)
+
+    factories: Dict[str, Callable[[int], Any]] = {
+        "Timerange": lambda i: draft.Timerange(i, 1000000),
+        "Clip_settings": lambda i: draft.Clip_settings(),
+        "Video_segment": lambda i: draft.Video_segment(video, draft.Timerange(i * 1000000, 1000000)),
+        "Audio_segment": lambda i: draft.Audio_segment(audio, draft.Timerange(i * 1000000, 1000000)),
+        "Text_segment": lambda i: draft.Text_segment("字幕", draft.Timerange(i * 1000000, 1000000), style=style),
+    }
+    results = {name: measure(lambda: [factory(i) for i in range(count)], count) for name, factory in factories.items()}
+    results["Keyframe"] = measure(lambda: build_keyframe_list(count), count)
+    return results
+
+def run_baseline(revision: str, count: int) -> Dict[str, float]:
+    """导出给定版本的代码, 并在子进程中对其进行测量"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = subprocess.run(["git", "archive", revision, "pyJianYingDraft"],
+                                 cwd=ROOT, check=True, stdout=subprocess.PIPE).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(tmp_dir)
+        output = subprocess.run([sys.executable, __file__, str(count), "--json", "--root", tmp_dir],
+                                check=True, stdout=subprocess.PIPE).stdout
+        return json.loads(output)
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("count", type=int, nargs="?", default=100000)
+    parser.add_argument("--baseline", help="用于对比的git版本")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--root", default=ROOT, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, args.root)
+    results = run(args.count)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    baseline: Optional[Dict[str, float]] = None
+    if args.baseline is not None:
+        baseline = run_baseline(args.baseline, args.count)
+
+    print("每类对象各%d个, 平均每个对象的字节数:" % args.count)
+    if baseline is None:
+        print("  %-16s %12s" % ("object", "bytes/obj"))
+    else:
+        print("  %-16s %12s %12s %8s" % ("object", args.baseline, "current", "change"))
+    for name, current in results.items():
+        if baseline is None:
+            print("  %-16s %12.0f" % (name, current))
+        else:
+            before = baseline[name]
+            print("  %-16s %12.0f %12.0f %7.0f%%" % (name, before, current, 100 * (current / before - 1)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""比较直接读取文件头部与使用pymediainfo(及imageio)探测素材的耗时
+
+用法: python benchmarks/bench_probe.py [素材文件...], 不指定文件时使用教程中的示例素材
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pyJianYingDraft.media_header import probe_video_header, probe_audio_header  # noqa: E402
+from pyJianYingDraft.local_materials import _probe_video_mediainfo, _probe_audio_mediainfo  # noqa: E402
+
+AUDIO_POSTFIXES = (".mp3", ".wav")
+
+def timeit(func, path: str, repeat: int) -> float:
+    """返回单次调用的平均耗时, 单位为毫秒"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(path)
+    return (time.perf_counter() - start) / repeat * 1e3
+
+def main() -> None:
+    paths = sys.argv[1:]
+    if len(paths) == 0:
+        asset_dir = os.path.join(os.path.dirname(__file__), "..", "readme_assets", "tutorial")
+        paths = [os.path.join(asset_dir, name) for name in ("video.mp4", "sticker.gif", "audio.mp3")]
+    repeat = 20
+
+    print("%-40s %12s %14s %10s  %s" % ("file", "header (ms)", "mediainfo (ms)", "speedup", "header result"))
+    for path in paths:
+        is_audio = os.path.splitext(path)[1].lower() in AUDIO_POSTFIXES
+        header_func = probe_audio_header if is_audio else probe_video_header
+        mediainfo_func = _probe_audio_mediainfo if is_audio else _probe_video_mediainfo
+
+        header_result = header_func(path)
+        header_ms = timeit(header_func, path, repeat)
+        mediainfo_ms = timeit(mediainfo_func, path, repeat)
+        print("%-40s %12.3f %14.3f %9.1fx  %s" % (os.path.basename(path), header_ms, mediainfo_ms,
+                                                  mediainfo_ms / header_ms,
+                                                  header_result if header_result is not None else "(fallback to pymediainfo)"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""比较模板模式下写时复制导入与完整复制导入的内存占用
+
+用法: python benchmarks/bench_template_memory.py [草稿文件(draft_content.json)...],
+不指定文件时生成一个含有大量视频片段(带关键帧)及文本片段的草稿
+"""
+
+import os
+import sys
+import gc
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pyJianYingDraft as draft  # noqa: E402
+from bench_json_codec import build_draft  # noqa: E402
+
+def measure(path: str, copy_on_write: bool) -> tuple:
+    """返回加载草稿后常驻的内存及加载并导出过程中的内存峰值, 单位为MB"""
+    gc.collect()
+    tracemalloc.start()
+    script = draft.Script_file.load_template(path, copy_on_write=copy_on_write)
+    current = tracemalloc.get_traced_memory()[0]
+    script.dumps()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del script
+    return current / 1e6, peak / 1e6
+
+def bench_file(path: str) -> None:
+    print("%s (%.1f MB)" % (path, os.path.getsize(path) / 1e6))
+    print("  %-14s %12s %12s" % ("mode", "loaded (MB)", "peak (MB)"))
+    results = {}
+    for copy_on_write in (False, True):
+        name = "copy_on_write" if copy_on_write else "full_copy"
+        results[name] = measure(path, copy_on_write)
+        print("  %-14s %12.1f %12.1f" % (name, *results[name]))
+    print("  常驻内存减少 %.0f%%" % (100 * (1 - results["copy_on_write"][0] / results["full_copy"][0])))
+
+def main() -> None:
+    paths = sys.argv[1:]
+    if len(paths) > 0:
+        for path in paths:
+            bench_file(path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "draft_content.json")
+        build_draft(path)
+        bench_file(path)
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-from .local_materials import Crop_settings, Video_material, Audio_material
+from .local_materials import Crop_settings, Video_material, Audio_material, load_materials, prefetch_materials
+from .probe_cache import Probe_cache, set_probe_cache
+from .json_codec import set_json_codec
+from .export_cache import set_export_cache
+from .id_provider import Id_provider, set_id_provider, use_id_provider
 from .keyframe import Keyframe_property
 
 from .time_util import Timerange
@@ -40,6 +44,15 @@ __all__ = [
     "Crop_settings",
     "Video_material",
     "Audio_material",
+    "load_materials",
+    "prefetch_materials",
+    "Probe_cache",
+    "set_probe_cache",
+    "set_json_codec",
+    "set_export_cache",
+    "Id_provider",
+    "set_id_provider",
+    "use_id_provider",
     "Keyframe_property",
     "Timerange",
     "Audio_segment",
@@ -1,17 +1,17 @@
 """定义视频/文本动画相关类"""
 
-import uuid
-
 from typing import Union, Optional
 from typing import Literal, Dict, List, Any
 
+from .export_cache import Exportable
+from .id_provider import new_id
 from .time_util import Timerange
 
 from .metadata.animation_meta import Animation_meta
 from .metadata import Intro_type, Outro_type, Group_animation_type
 from .metadata import Text_intro, Text_outro, Text_loop_anim
 
-class Animation:
+class Animation(Exportable):
     """一个视频/文本动画效果"""
 
     name: str
@@ -92,7 +92,7 @@ class Text_animation(Animation):
 
         self.is_video_animation = False
 
-class Segment_animations:
+class Segment_animations(Exportable):
     """附加于某素材上的一系列动画
 
     对视频片段：入场、出场或组合动画；对文本片段：入场、出场或循环动画"""
@@ -104,7 +104,7 @@ class Segment_animations:
     """动画列表"""
 
     def __init__(self):
-        self.animation_id = uuid.uuid4().hex
+        self.animation_id = new_id()
         self.animations = []
 
     def get_animation_trange(self, animation_type: Literal["in", "out", "group", "loop"]) -> Optional[Timerange]:
@@ -130,6 +130,7 @@ class Segment_animations:
                 raise ValueError("当前片段已存在循环动画, 若希望同时使用循环动画和入出场动画, 请先添加出入场动画再添加循环动画")
 
         self.animations.append(animation)
+        self.touch()
 
     def export_json(self) -> Dict[str, Any]:
         return {
@@ -3,20 +3,20 @@
 包含淡入淡出效果、音频特效等相关类
 """
 
-import uuid
-
 from typing import Optional, Literal, Union
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Sequence
 
+from .export_cache import Exportable
+from .id_provider import new_id
 from .time_util import tim, Timerange
 from .segment import Media_segment
 from .local_materials import Audio_material
-from .keyframe import Keyframe_property, Keyframe_list
+from .keyframe import Keyframe_property
 
 from .metadata import Effect_param_instance
 from .metadata import Audio_scene_effect_type, Tone_effect_type, Speech_to_song_type
 
-class Audio_fade:
+class Audio_fade(Exportable):
     """音频淡入淡出效果"""
 
     fade_id: str
@@ -30,7 +30,7 @@ class Audio_fade:
     def __init__(self, in_duration: int, out_duration: int):
         """根据给定的淡入/淡出时长构造一个淡入淡出效果"""
 
-        self.fade_id = uuid.uuid4().hex
+        self.fade_id = new_id()
         self.in_duration = in_duration
         self.out_duration = out_duration
 
@@ -43,7 +43,7 @@ class Audio_fade:
             "type": "audio_fade"
         }
 
-class Audio_effect:
+class Audio_effect(Exportable):
     """音频特效对象"""
 
     name: str
@@ -63,7 +63,7 @@ class Audio_effect:
         """根据给定的音效元数据及参数列表构造一个音频特效对象, params的范围是0~100"""
 
         self.name = effect_meta.value.name
-        self.effect_id = uuid.uuid4().hex
+        self.effect_id = new_id()
         self.resource_id = effect_meta.value.resource_id
         self.audio_adjust_params = []
 
@@ -101,6 +101,8 @@ class Audio_effect:
 class Audio_segment(Media_segment):
     """安放在轨道上的一个音频片段"""
 
+    __slots__ = ("fade", "effects")
+
     fade: Optional[Audio_fade]
     """音频淡入淡出效果, 可能为空
 
@@ -165,6 +167,7 @@ class Audio_segment(Media_segment):
             raise ValueError("当前音频片段已经有此类型 (%s) 的音效了" % effect_inst.category_name)
         self.effects.append(effect_inst)
         self.extra_material_refs.append(effect_inst.effect_id)
+        self.touch()
 
         return self
 
@@ -186,24 +189,32 @@ class Audio_segment(Media_segment):
 
         self.fade = Audio_fade(in_duration, out_duration)
         self.extra_material_refs.append(self.fade.fade_id)
+        self.touch()
 
         return self
 
-    def add_keyframe(self, time_offset: int, volume: float) -> "Audio_segment":
+    def add_keyframe(self, time_offset: Union[int, str], volume: float) -> "Audio_segment":
         """为音频片段创建一个*控制音量*的关键帧, 并自动加入到关键帧列表中
 
         Args:
-            time_offset (`int`): 关键帧的时间偏移量, 单位为微秒
+            time_offset (`int` or `str`): 关键帧的时间偏移量, 单位为微秒. 若传入字符串则会调用`tim()`函数进行解析.
             volume (`float`): 音量在`time_offset`处的值
         """
-        _property = Keyframe_property.volume
-        for kf_list in self.common_keyframes:
-            if kf_list.keyframe_property == _property:
-                kf_list.add_keyframe(time_offset, volume)
-                return self
-        kf_list = Keyframe_list(_property)
-        kf_list.add_keyframe(time_offset, volume)
-        self.common_keyframes.append(kf_list)
+        time_offset = tim(time_offset) if isinstance(time_offset, str) else int(time_offset)  # 兼容NumPy整数等类型
+        self._keyframe_list(Keyframe_property.volume).add_keyframe(time_offset, volume)
+        return self
+
+    def add_keyframes(self, time_offsets: Sequence[int], volumes: Sequence[float]) -> "Audio_segment":
+        """为音频片段批量创建*控制音量*的关键帧, 结果与逐个调用`add_keyframe`相同, 但快得多
+
+        Args:
+            time_offsets (`Sequence[int]`): 各关键帧的时间偏移量, 单位为微秒, 可以为列表或NumPy数组等
+            volumes (`Sequence[float]`): 各时间偏移量处的音量, 长度应与`time_offsets`相同
+
+        Raises:
+            `ValueError`: 两序列的长度不同
+        """
+        self._keyframe_list(Keyframe_property.volume).add_keyframes(time_offsets, volumes)
         return self
 
     def export_json(self) -> Dict[str, Any]:
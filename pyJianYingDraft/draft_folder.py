@@ -3,9 +3,10 @@
 import os
 import shutil
 
-from typing import List
+from typing import List, Dict, Any, Iterable
 
 from .script_file import Script_file
+from .json_reader import read_fields
 
 class Draft_folder:
     """管理一个文件夹及其内的一系列草稿"""
@@ -62,8 +63,31 @@ class Draft_folder:
         if not os.path.exists(draft_path):
             raise FileNotFoundError(f"草稿文件夹 {draft_name} 不存在")
 
-        script_file = self.load_template(draft_name)
-        script_file.inspect_material()
+        # 只读取贴纸素材列表, 而不解析整个草稿
+        stickers = self.read_fields(draft_name, ["materials.stickers"]).get("materials.stickers", [])
+        print("贴纸素材:")
+        for sticker in stickers:
+            print("\tResource id: %s '%s'" % (sticker["resource_id"], sticker.get("name", "")))
+
+    def read_fields(self, draft_name: str, fields: Iterable[str]) -> Dict[str, Any]:
+        """增量地读取指定名称草稿中的部分字段, 而不加载整个草稿, 适用于批量查询草稿时长、素材路径等信息
+
+        Args:
+            draft_name (`str`): 草稿名称, 即相应文件夹名称
+            fields (`Iterable[str]`): 待读取的字段路径, 如`duration`, `canvas_config`, `materials.videos[*].path`.
+                以`.`分隔对象的键, 以`[*]`表示数组的所有元素.
+
+        Returns:
+            `Dict[str, Any]`: 以字段路径为键的读取结果. 含有`[*]`的字段对应所有匹配值组成的列表, 其余字段不存在时不会出现在结果中
+
+        Raises:
+            `FileNotFoundError`: 对应的草稿不存在
+        """
+        draft_path = os.path.join(self.folder_path, draft_name)
+        if not os.path.exists(draft_path):
+            raise FileNotFoundError(f"草稿文件夹 {draft_name} 不存在")
+
+        return read_fields(os.path.join(draft_path, "draft_content.json"), fields)
 
     def load_template(self, draft_name: str) -> Script_file:
         """在文件夹中打开一个草稿作为模板, 并在其上进行编辑
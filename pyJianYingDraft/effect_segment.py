@@ -11,6 +11,8 @@ from .metadata import Video_scene_effect_type, Video_character_effect_type, Filt
 class Effect_segment(Base_segment):
     """放置在独立特效轨道上的特效片段"""
 
+    __slots__ = ("effect_inst",)
+
     effect_inst: Video_effect
     """相应的特效素材
 
@@ -25,6 +27,8 @@ class Effect_segment(Base_segment):
 class Filter_segment(Base_segment):
     """放置在独立滤镜轨道上的滤镜片段"""
 
+    __slots__ = ("material",)
+
     material: Filter
     """相应的滤镜素材
 
@@ -0,0 +1,219 @@
+"""导出结果缓存, 使未被修改的对象在重复导出时可以直接复用此前的导出结果及其JSON编码
+
+对象被导出时, 其导出结果会登记在它自身及所有子对象上; 任一对象调用`touch`方法标记自身被修改后, 登记在其上的导出结果都会失效.
+因此重复导出时只需检查各个缓存是否仍然有效, 而无需遍历未被修改的对象.
+
+缓存默认禁用, 需通过`set_export_cache`启用. 本库中修改对象的方法(如`add_effect`、`add_keyframe`)及属性setter(如`Timerange.start`)会自动调用`touch`.
+注意: 启用缓存后, 直接为对象的属性赋值或原地修改其中的列表时**不会**自动标记, 此时需手动调用被修改对象的`touch`方法
+"""
+
+import operator
+
+from abc import ABC, abstractmethod
+from typing import Optional, ClassVar, Callable, Union, Any, Dict, List, Set, Tuple, Iterable, Iterator
+
+_revision = 0
+"""全局修改版本号, 任一对象调用`touch`时递增"""
+_cache_epoch: Optional[int] = None
+"""导出缓存的启用批次, 每次启用时更新, 以使此前的缓存全部失效; 为None表示缓存未启用"""
+
+def set_export_cache(enabled: bool) -> None:
+    """启用或禁用导出结果缓存, 默认禁用
+
+    启用后, 未被修改的对象在重复导出时将直接复用此前的导出结果, `Script_file.dump`的`skip_unchanged`也可据此跳过未修改草稿的导出.
+    此时直接为已导出对象的属性赋值(如`segment.volume = 0.5`)或原地修改其中的列表后, 须调用该对象的`touch`方法, 否则导出结果不会更新
+
+    Args:
+        enabled (`bool`): 是否启用缓存
+    """
+    global _cache_epoch
+    mark_changed()  # 禁用期间未被标记的修改不应被当作未修改
+    _cache_epoch = _revision if enabled else None
+
+def export_cache_enabled() -> bool:
+    """返回导出结果缓存是否已启用"""
+    return _cache_epoch is not None
+
+def global_revision() -> int:
+    """返回全局修改版本号, 其未变化说明此期间没有对象被标记为已修改"""
+    return _revision
+
+def mark_changed() -> None:
+    """递增全局修改版本号, 供不继承`Exportable`的容器(如轨道、素材列表)在被修改时调用"""
+    global _revision
+    _revision += 1
+
+class Change_flag:
+    """依赖于若干可导出对象的标志, 在其中任一对象被标记为已修改时失效"""
+
+    valid: bool
+    """所依赖的对象是否均未被修改"""
+
+    def __init__(self):
+        self.valid = True
+
+class Cached_export(Change_flag):
+    """一个对象的导出结果, 以及按需生成的JSON编码文本, 可直接交由`dump_stream`写出"""
+
+    epoch: Optional[int]
+    """生成时的缓存启用批次"""
+    extra: Dict[str, Any]
+    """附加在导出结果上的额外字段"""
+    data: Dict[str, Any]
+    """导出结果, 不应被修改"""
+
+    _encoded: Optional[Tuple[Any, str]]
+    """最近一次编码所用的(编解码后端, 缩进, 层级)及编码结果"""
+
+    def __init__(self, extra: Dict[str, Any], data: Dict[str, Any]):
+        super().__init__()
+        self.epoch = _cache_epoch
+        self.extra = extra
+        self.data = data
+        self._encoded = None
+
+    def encode(self, codec: Any, indent: Optional[int], level: int) -> str:
+        """返回以给定后端编码, 并缩进至给定层级的JSON文本"""
+        key = (codec, indent, level)
+        if self._encoded is None or self._encoded[0] != key:
+            encoded: str = codec.dumps(self.data, indent)
+            if indent is not None and level > 0:
+                # JSON字符串中的换行符总是被转义, 故可直接按换行符重新缩进
+                encoded = encoded.replace("\n", "\n" + " " * (indent * level))
+            self._encoded = (key, encoded)
+        return self._encoded[1]
+
+_exportable_types: Set[type] = set()
+"""`Exportable`的所有子类, 用于快速判断对象是否可导出, 以免对抽象基类调用`isinstance`的开销"""
+
+class Exportable(ABC):
+    """支持导出结果缓存的对象基类, 子类需实现`export_json`方法
+
+    子类可以声明`__slots__`以省去每个实例的属性字典, 此时其属性仍可被正常地遍历、复制及序列化
+    """
+
+    __slots__ = ("_export_cache", "_dependents")
+
+    _export_cache: Optional[Cached_export]
+    """最近一次的导出结果"""
+    _dependents: Union[None, Change_flag, List[Change_flag]]
+    """依赖于此对象的标志, 通常只有一个, 故此时不另建列表"""
+
+    _attr_slots: ClassVar[Tuple[str, ...]] = ()
+    """子类(及其父类)以`__slots__`声明的属性名, 在定义子类时自动生成"""
+    _has_instance_dict: ClassVar[bool] = False
+    """子类的实例是否带有属性字典, 即继承链上是否有未声明`__slots__`的类"""
+    _slot_values: ClassVar[Callable[[Any], Tuple[Any, ...]]] = staticmethod(lambda obj: ())
+    """一次性取出所有槽中的值, 有未被赋值的槽时抛出`AttributeError`"""
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        names: List[str] = []
+        for klass in reversed(cls.__mro__):
+            if klass is Exportable:
+                continue
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in names and name not in ("__dict__", "__weakref__"):
+                    names.append(name)
+        cls._attr_slots = tuple(names)
+        if len(names) == 1:
+            getter = operator.attrgetter(names[0])
+            cls._slot_values = staticmethod(lambda obj: (getter(obj),))
+        elif len(names) > 1:
+            cls._slot_values = staticmethod(operator.attrgetter(*names))
+        cls._has_instance_dict = any("__dict__" in klass.__dict__ for klass in cls.__mro__ if klass is not object)
+        _exportable_types.add(cls)
+
+    def touch(self) -> None:
+        """标记对象已被修改, 使其及包含它的对象的导出缓存失效"""
+        global _revision
+        _revision += 1
+        dependents = getattr(self, "_dependents", None)
+        if dependents is None:
+            return
+        if isinstance(dependents, list):
+            for flag in dependents:
+                flag.valid = False
+        else:
+            dependents.valid = False
+        self._dependents = None
+
+    def add_dependent(self, flag: Change_flag) -> None:
+        """使`flag`在此对象下次被标记为已修改时失效"""
+        dependents = getattr(self, "_dependents", None)
+        if dependents is None:
+            self._dependents = flag
+        elif not isinstance(dependents, list):
+            self._dependents = [dependents, flag] if dependents.valid else flag
+        else:
+            dependents.append(flag)
+            # 被多个对象共享时, 每当列表长度翻倍便清理已失效的标志, 使其长度与有效标志的数量成正比
+            if len(dependents) >= 8 and len(dependents) & (len(dependents) - 1) == 0:
+                dependents[:] = [dep for dep in dependents if dep.valid]
+
+    def _attr_items(self) -> Iterator[Tuple[str, Any]]:
+        """遍历对象已被赋值的所有属性, 不含导出缓存及其依赖"""
+        for name in self._attr_slots:
+            try:
+                yield name, object.__getattribute__(self, name)
+            except AttributeError:  # 未被赋值的槽
+                pass
+        if self._has_instance_dict:
+            yield from self.__dict__.items()
+
+    def _attr_values(self) -> Iterable[Any]:
+        """返回对象所有属性的值"""
+        if len(self._attr_slots) == 0:
+            return self.__dict__.values()
+        try:
+            values: Iterable[Any] = self._slot_values(self)
+        except AttributeError:  # 有未被赋值的槽
+            values = [getattr(self, name, None) for name in self._attr_slots]
+        if self._has_instance_dict:
+            values = list(values) + list(self.__dict__.values())
+        return values
+
+    def add_dependent_recursive(self, flag: Change_flag) -> None:
+        """使`flag`在此对象或其(直接或在列表、字典的值中)包含的任一可导出子对象下次被标记为已修改时失效"""
+        self.add_dependent(flag)
+        for value in self._attr_values():
+            if type(value) in _exportable_types:
+                value.add_dependent_recursive(flag)
+            elif isinstance(value, list) and len(value) > 0 and type(value[0]) in _exportable_types:
+                # 列表中的元素总是同类的, 故只需检查首个元素
+                for item in value:
+                    item.add_dependent_recursive(flag)
+            elif isinstance(value, dict) and len(value) > 0 and type(next(iter(value.values()))) in _exportable_types:
+                for item in value.values():
+                    item.add_dependent_recursive(flag)
+
+    @abstractmethod
+    def export_json(self) -> Dict[str, Any]: ...
+
+    def export_cached(self, **extra: Any) -> Cached_export:
+        """返回(缓存启用时可能已缓存的)导出结果, `extra`中的字段将被附加在导出结果上"""
+        data: Dict[str, Any]
+        if _cache_epoch is None:
+            data = self.export_json()
+            data.update(extra)
+            return Cached_export(extra, data)
+
+        cache: Optional[Cached_export] = getattr(self, "_export_cache", None)
+        if cache is not None and cache.valid and cache.epoch == _cache_epoch and cache.extra == extra:
+            return cache
+        if cache is not None:
+            cache.valid = False  # 不再使用的缓存应能从依赖列表中被清理
+        data = self.export_json()
+        data.update(extra)
+        cache = Cached_export(extra, data)
+        self._export_cache = cache
+        self.add_dependent_recursive(cache)
+        return cache
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 缓存及其依赖不随对象复制
+        return dict(self._attr_items())
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
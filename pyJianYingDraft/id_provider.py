@@ -0,0 +1,97 @@
+"""草稿中各对象(片段、关键帧、特效等)全局id的生成
+
+默认使用"随机前缀+计数器"的方式生成32位十六进制id, 比逐个调用`uuid.uuid4()`快得多;
+指定种子时前缀由种子决定且计数器从头开始, 此时相同的输入总会生成逐字节相同的草稿.
+`use_id_provider`可在当前线程(或协程)中临时替换id生成器, 而不影响其它线程
+"""
+
+import os
+import uuid
+import random
+import itertools
+import contextlib
+
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Optional, Union, Iterator
+
+class Id_provider(ABC):
+    """id生成器基类"""
+
+    @abstractmethod
+    def new_id(self) -> str:
+        """生成一个新的32位十六进制id"""
+
+class Uuid4_provider(Id_provider):
+    """以`uuid.uuid4()`生成id, 即此前版本的行为"""
+
+    def new_id(self) -> str:
+        return uuid.uuid4().hex
+
+class Counter_provider(Id_provider):
+    """以64位前缀及64位计数器拼接生成id"""
+
+    seed: Optional[int]
+    """生成前缀所用的种子, 为None时前缀完全随机"""
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed (`int`, optional): 种子, 指定时生成的id序列完全确定. 默认为None, 即使用随机前缀.
+        """
+        self.seed = seed
+        if seed is None:
+            prefix = int.from_bytes(os.urandom(8), "big")
+        else:
+            prefix = random.Random(seed).getrandbits(64)
+        self._prefix = "%016x" % prefix
+        self._counter = itertools.count(1)
+
+    def new_id(self) -> str:
+        return "%s%016x" % (self._prefix, next(self._counter))
+
+_active_provider: Id_provider = Counter_provider()
+_scoped_provider: ContextVar[Optional[Id_provider]] = ContextVar("scoped_id_provider", default=None)
+
+def set_id_provider(provider: Union[Id_provider, int, None]) -> None:
+    """设置此后在所有线程中创建的对象所使用的id生成器, 在`use_id_provider`的作用范围内则以后者为准
+
+    Args:
+        provider (`Id_provider`, `int` or None): id生成器实例; 为整数时以其为种子创建确定性的`Counter_provider`;
+            为None时恢复默认的随机前缀生成器
+    """
+    global _active_provider
+    if provider is None or isinstance(provider, int):
+        provider = Counter_provider(provider)
+    _active_provider = provider
+
+@contextlib.contextmanager
+def use_id_provider(provider: Union[Id_provider, int]) -> Iterator[Id_provider]:
+    """在`with`语句的范围内, 令当前线程(或协程)中创建的对象使用给定的id生成器, 退出时恢复
+
+    Args:
+        provider (`Id_provider` or `int`): id生成器实例; 为整数时以其为种子创建确定性的`Counter_provider`
+    """
+    if isinstance(provider, int):
+        provider = Counter_provider(provider)
+    token = _scoped_provider.set(provider)
+    try:
+        yield provider
+    finally:
+        _scoped_provider.reset(token)
+
+def get_id_provider() -> Id_provider:
+    """获取当前使用的id生成器"""
+    return _scoped_provider.get() or _active_provider
+
+def new_id() -> str:
+    """以当前的id生成器生成一个新的id"""
+    return (_scoped_provider.get() or _active_provider).new_id()
+
+def _reset_after_fork() -> None:
+    # 子进程继承了父进程的前缀及计数器, 需重新生成随机前缀以免与父进程生成重复的id
+    if isinstance(_active_provider, Counter_provider) and _active_provider.seed is None:
+        set_id_provider(None)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
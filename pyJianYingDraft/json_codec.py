@@ -0,0 +1,101 @@
+"""草稿读写所使用的JSON编解码后端
+
+默认在安装了orjson时使用orjson, 否则使用标准库json. 两者的输出均不转义非ASCII字符, 可被剪映正常读取;
+但只有标准库后端保证输出与此前版本逐字节一致(orjson对部分浮点数采用更短的指数记法, 如`1e-7`)
+"""
+
+import json
+
+from abc import ABC, abstractmethod
+from typing import Optional, Union, Any, Dict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class Json_codec(ABC):
+    """JSON编解码后端基类"""
+
+    name: str
+    """后端名称"""
+
+    @abstractmethod
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """解析JSON文本"""
+
+    @abstractmethod
+    def dumps(self, obj: Any, indent: Optional[int] = 4) -> str:
+        """将对象编码为不转义非ASCII字符的JSON文本, `indent`为None时输出不含多余空白的紧凑格式"""
+
+class Stdlib_codec(Json_codec):
+    """基于标准库json的后端"""
+
+    name = "stdlib"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = 4) -> str:
+        if indent is None:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(obj, ensure_ascii=False, indent=indent)
+
+def _reindent(data: bytes, indent: int) -> bytes:
+    """将2空格缩进的JSON文本改为指定的缩进
+
+    JSON文本中的换行符及制表符总是被转义, 故可以由深至浅地将每一层的行首缩进替换为制表符, 最后再统一展开
+    """
+    depth = 0
+    while b"\n" + b"  " * (depth + 1) in data:
+        depth += 1
+    for level in range(depth, 0, -1):
+        data = data.replace(b"\n" + b"  " * level, b"\n" + b"\t" * level)
+    return data.replace(b"\t", b" " * indent)
+
+class Orjson_codec(Json_codec):
+    """基于orjson的后端, 需要安装orjson"""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("使用orjson后端需要安装orjson")
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any, indent: Optional[int] = 4) -> str:
+        if indent is None:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        ret = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        if indent != 2:  # orjson仅支持2空格缩进
+            ret = _reindent(ret, indent)
+        return ret.decode("utf-8")
+
+_CODECS: Dict[str, type] = {"stdlib": Stdlib_codec, "orjson": Orjson_codec}
+_active_codec: Optional[Json_codec] = None
+
+def set_json_codec(codec: Union[str, Json_codec, None]) -> None:
+    """设置草稿读写所使用的JSON编解码后端
+
+    Args:
+        codec (`str`, `Json_codec` or None): 后端名称("stdlib"或"orjson")或后端实例, 为None时恢复自动选择
+
+    Raises:
+        `ValueError`: 未知的后端名称
+        `ImportError`: 所选后端依赖的库未安装
+    """
+    global _active_codec
+    if isinstance(codec, str):
+        if codec not in _CODECS:
+            raise ValueError("未知的JSON后端: %s" % codec)
+        codec = _CODECS[codec]()
+    _active_codec = codec
+
+def get_json_codec() -> Json_codec:
+    """获取当前使用的JSON编解码后端, 未设置时自动选择可用的最快后端"""
+    global _active_codec
+    if _active_codec is None:
+        _active_codec = Orjson_codec() if orjson is not None else Stdlib_codec()
+    return _active_codec
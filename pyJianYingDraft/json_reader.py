@@ -0,0 +1,263 @@
+"""增量式JSON读取, 用于在不解析整个草稿文件的情况下提取其中的部分字段
+
+读取时按块读入文件, 仅对通向所选字段的对象及数组进行逐个词法单元的解析, 其余值则只扫描其括号以确定边界并直接跳过;
+所选字段的值被完整截取后再交由`json`解析. 所有字段均已读取完毕时即停止读取, 故内存占用与所选字段的大小相当,
+耗时则取决于最后一个所选字段在文件中的位置
+"""
+
+import re
+import json
+
+from typing import Optional, Union, List, Dict, Tuple, Any, Iterable, TextIO
+
+_WHITESPACE = re.compile(r"\s*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = re.compile(r'[^,:{}\[\]"\s]+')
+"""匹配一个数字或字面量, 其合法性留待解析时检查"""
+_SKIP = re.compile(r'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*')
+"""匹配一段不含括号的内容, 其中的字符串作为整体跳过"""
+
+WILDCARD = "*"
+"""字段路径中表示数组所有元素的组分"""
+
+def parse_field(field: str) -> Tuple[str, ...]:
+    """将形如`materials.videos[*].path`的字段路径解析为组分元组, 数组的所有元素以`WILDCARD`表示
+
+    Raises:
+        `ValueError`: 字段路径格式不正确
+    """
+    components: List[str] = []
+    for part in field.split("."):
+        key, bracket, rest = part.partition("[")
+        if len(key) == 0:
+            raise ValueError("字段路径 '%s' 格式不正确" % field)
+        components.append(key)
+        while bracket:
+            if not rest.startswith("*]"):
+                raise ValueError("字段路径 '%s' 格式不正确, 数组下标仅支持'*'" % field)
+            components.append(WILDCARD)
+            bracket, rest = rest[2:3], rest[3:]
+            if bracket not in ("", "["):
+                raise ValueError("字段路径 '%s' 格式不正确" % field)
+    return tuple(components)
+
+def _extract(value: Any, path: Tuple[str, ...]) -> Iterable[Any]:
+    """从已解析的值中提取位于给定相对路径的所有值"""
+    if len(path) == 0:
+        yield value
+    elif path[0] == WILDCARD:
+        if isinstance(value, list):
+            for item in value:
+                yield from _extract(item, path[1:])
+    elif isinstance(value, dict) and path[0] in value:
+        yield from _extract(value[path[0]], path[1:])
+
+class _Selector:
+    """一个待读取的字段"""
+
+    field: str
+    path: Tuple[str, ...]
+    multiple: bool
+    """路径中是否含有通配符, 若是则读取结果为列表"""
+
+    def __init__(self, field: str):
+        self.field = field
+        self.path = parse_field(field)
+        self.multiple = WILDCARD in self.path
+
+class _Incremental_reader:
+    """按块读取文本, 并在缓冲区上进行词法分析"""
+
+    def __init__(self, fp: TextIO, selectors: List[_Selector], chunk_size: int):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.mark: Optional[int] = None
+        """正在截取的值在缓冲区中的起始位置, 读入新数据时不会丢弃其后的内容"""
+
+        self.result: Dict[str, Any] = {sel.field: [] for sel in selectors if sel.multiple}
+        self.pending = len(selectors)
+
+    def fill(self) -> bool:
+        """读入新的数据块, 并丢弃已处理的内容. 文件已读完时返回False"""
+        if self.eof:
+            return False
+        # 截取较大的值时按已缓冲的长度倍增读入量, 避免反复拼接缓冲区
+        size = self.chunk_size if self.mark is None else max(self.chunk_size, len(self.buffer) - self.mark)
+        chunk = self.fp.read(size)
+        if len(chunk) == 0:
+            self.eof = True
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buffer = self.buffer[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def error(self, message: str) -> ValueError:
+        return ValueError("JSON格式错误: %s" % message)
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符, 文件结束时返回空串"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error("应为 '%s'" % char)
+        self.pos += 1
+
+    def read_string(self) -> str:
+        self.peek()
+        while True:
+            match = _STRING.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return json.loads(match.group())
+            if not self.fill():
+                raise self.error("字符串未结束")
+
+    def skip_value(self) -> None:
+        """跳过一个值而不解析它"""
+        first = self.peek()
+        if first == "":
+            raise self.error("意外的文件结尾")
+        if first == '"':
+            self.read_string()
+            return
+        if first not in "{[":
+            while True:
+                match = _SCALAR.match(self.buffer, self.pos)
+                # 匹配至缓冲区末尾时, 该值可能尚未读完
+                if match is not None and (match.end() < len(self.buffer) or self.eof):
+                    self.pos = match.end()
+                    return
+                if not self.fill():
+                    if match is None:
+                        raise self.error("无法识别的值")
+
+        depth = 0
+        while True:
+            self.pos = _SKIP.match(self.buffer, self.pos).end()
+            if self.pos >= len(self.buffer) or self.buffer[self.pos] == '"':  # 缓冲区耗尽或字符串被截断
+                if not self.fill():
+                    raise self.error("意外的文件结尾")
+                continue
+            char = self.buffer[self.pos]
+            self.pos += 1
+            depth += 1 if char in "{[" else -1
+            if depth == 0:
+                return
+
+    def capture_value(self) -> Any:
+        """完整截取并解析一个值"""
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            return json.loads(self.buffer[self.mark:self.pos])
+        finally:
+            self.mark = None
+
+    def read_value(self, selectors: List[Tuple[_Selector, int]]) -> None:
+        """读取一个值, `selectors`为路径经过此值的字段及此值在其路径中的深度"""
+        for sel, depth in selectors:
+            if depth == len(sel.path):
+                # 此值需被完整读取, 路径更深的字段直接从读取结果中提取
+                value = self.capture_value()
+                for other, other_depth in selectors:
+                    for item in _extract(value, other.path[other_depth:]):
+                        self.store(other, item)
+                return
+
+        char = self.peek()
+        if char == "{":
+            self.read_object(selectors)
+        elif char == "[":
+            self.read_array(selectors)
+        else:
+            self.skip_value()
+
+    def store(self, sel: _Selector, value: Any) -> None:
+        if sel.multiple:
+            self.result[sel.field].append(value)
+        else:
+            self.result[sel.field] = value
+
+    def read_object(self, selectors: List[Tuple[_Selector, int]], top_level: bool = False) -> None:
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_string()
+            self.expect(":")
+            matched = [(sel, depth + 1) for sel, depth in selectors if sel.path[depth] == key]
+            if len(matched) == 0:
+                self.skip_value()
+            else:
+                self.read_value(matched)
+                if top_level:
+                    self.pending -= len(matched)
+                    if self.pending == 0:  # 所有字段均已读取, 无需继续
+                        return
+
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self.error("应为 ',' 或 '}'")
+
+    def read_array(self, selectors: List[Tuple[_Selector, int]]) -> None:
+        self.expect("[")
+        matched = [(sel, depth + 1) for sel, depth in selectors if sel.path[depth] == WILDCARD]
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            if len(matched) == 0:
+                self.skip_value()
+            else:
+                self.read_value(matched)
+
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self.error("应为 ',' 或 ']'")
+
+def read_fields(source: Union[str, TextIO], fields: Iterable[str], *, chunk_size: int = 1 << 16) -> Dict[str, Any]:
+    """从JSON文件中增量地读取指定字段, 而不解析整个文件
+
+    Args:
+        source (`str` or `TextIO`): JSON文件路径, 或以文本模式打开的文件对象
+        fields (`Iterable[str]`): 待读取的字段路径, 如`duration`, `canvas_config`, `materials.videos[*].path`.
+            以`.`分隔对象的键, 以`[*]`表示数组的所有元素.
+        chunk_size (`int`, optional): 每次读入的字符数. 默认为65536.
+
+    Returns:
+        `Dict[str, Any]`: 以字段路径为键的读取结果. 含有`[*]`的字段对应所有匹配值组成的列表, 其余字段不存在时不会出现在结果中
+
+    Raises:
+        `ValueError`: 字段路径或JSON格式不正确
+    """
+    selectors = [_Selector(field) for field in dict.fromkeys(fields)]
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as fp:
+            return read_fields(fp, [sel.field for sel in selectors], chunk_size=chunk_size)
+
+    reader = _Incremental_reader(source, selectors, chunk_size)
+    if len(selectors) > 0:
+        if reader.peek() != "{":
+            raise reader.error("顶层应为对象")
+        reader.read_object([(sel, 0) for sel in selectors], top_level=True)
+    return reader.result
@@ -0,0 +1,82 @@
+"""流式JSON写出, 用于在不构造完整JSON字符串的情况下导出草稿文件
+
+待写出的对象中, 以迭代器(如生成器)形式给出的值将被视为JSON数组, 其元素在写出时才逐个求值;
+其余值仍交由JSON编解码后端整体编码, 故每次仅需在内存中保留单个元素的导出结果. `Cached_export`将直接复用其缓存的编码文本
+"""
+
+import json
+
+from collections.abc import Iterator
+from typing import Optional, TextIO
+from typing import Dict, Any, Iterable
+
+from .json_codec import Json_codec, get_json_codec
+from .export_cache import Cached_export
+
+def _contains_stream(obj: Any) -> bool:
+    """判断对象中是否含有需要流式写出的迭代器"""
+    if isinstance(obj, Iterator):
+        return True
+    if isinstance(obj, dict):
+        return any(_contains_stream(value) for value in obj.values())
+    return False
+
+class _Stream_writer:
+    """将对象流式写出至文件, 其格式与`codec.dumps(obj, indent)`完全一致"""
+
+    def __init__(self, fp: TextIO, indent: Optional[int], codec: Json_codec):
+        self.fp = fp
+        self.indent = indent
+        self.codec = codec
+        self.key_separator = ":" if indent is None else ": "
+
+    def newline(self, level: int) -> str:
+        """返回换行并缩进至指定层级的字符串, 紧凑模式下为空"""
+        if self.indent is None:
+            return ""
+        return "\n" + " " * (self.indent * level)
+
+    def write_value(self, obj: Any, level: int) -> None:
+        if isinstance(obj, Cached_export):
+            self.fp.write(obj.encode(self.codec, self.indent, level))
+        elif isinstance(obj, Iterator):
+            self.write_array(obj, level)
+        elif isinstance(obj, dict) and _contains_stream(obj):
+            self.write_object(obj, level)
+        else:
+            encoded = self.codec.dumps(obj, self.indent)
+            if self.indent is not None and level > 0:
+                # JSON字符串中的换行符总是被转义, 故可直接按换行符重新缩进
+                encoded = encoded.replace("\n", self.newline(level))
+            self.fp.write(encoded)
+
+    def write_object(self, obj: Dict[str, Any], level: int) -> None:
+        if len(obj) == 0:
+            self.fp.write("{}")
+            return
+        inner = self.newline(level + 1)
+        self.fp.write("{")
+        for i, (key, value) in enumerate(obj.items()):
+            self.fp.write(("," if i > 0 else "") + inner + json.dumps(key, ensure_ascii=False) + self.key_separator)
+            self.write_value(value, level + 1)
+        self.fp.write(self.newline(level) + "}")
+
+    def write_array(self, items: Iterable[Any], level: int) -> None:
+        inner = self.newline(level + 1)
+        empty = True
+        for item in items:
+            self.fp.write(("[" if empty else ",") + inner)
+            self.write_value(item, level + 1)
+            empty = False
+        self.fp.write("[]" if empty else self.newline(level) + "]")
+
+def dump_stream(obj: Any, fp: TextIO, *, indent: Optional[int] = 4, codec: Optional[Json_codec] = None) -> None:
+    """将对象以JSON格式流式写入文件, 对象中的迭代器将被逐个元素地写出为数组
+
+    Args:
+        obj (`Any`): 待写出的对象, 其中可以包含迭代器
+        fp (`TextIO`): 以文本模式打开的文件对象
+        indent (`int`, optional): 缩进空格数, 默认为4. 为None时输出不含任何多余空白的紧凑格式.
+        codec (`Json_codec`, optional): 编码各元素所用的JSON后端, 默认为当前启用的后端
+    """
+    _Stream_writer(fp, indent, codec or get_json_codec()).write_value(obj, 0)
@@ -1,11 +1,17 @@
-import uuid
+import bisect
 
+from array import array
 from enum import Enum
-from typing import Dict, List, Any
+from typing import Dict, List, Tuple, Any, Sequence, NamedTuple
 
-class Keyframe:
+from .export_cache import Exportable
+from .id_provider import new_id
+
+class Keyframe(Exportable):
     """一个关键帧（关键点）, 目前只支持线性插值"""
 
+    __slots__ = ("kf_id", "time_offset", "values")
+
     kf_id: str
     """关键帧全局id, 自动生成"""
     time_offset: int
@@ -15,23 +21,37 @@ class Keyframe:
 
     def __init__(self, time_offset: int, value: float):
         """给定时间偏移量及关键值, 初始化关键帧"""
-        self.kf_id = uuid.uuid4().hex
+        self.kf_id = new_id()
 
         self.time_offset = time_offset
         self.values = [value]
 
+    _EXPORT_SKELETON: Dict[str, Any] = {
+        # 默认值
+        "curveType": "Line",
+        "graphID": "",
+        "left_control": None,
+        "right_control": None,
+        # 自定义属性
+        "id": None,
+        "time_offset": None,
+        "values": None
+    }
+    """导出结果中的常量部分, 各变量字段及嵌套的字典仅占位以保持键的顺序, 每次导出时重新生成"""
+
     def export_json(self) -> Dict[str, Any]:
-        return {
-            # 默认值
-            "curveType": "Line",
-            "graphID": "",
-            "left_control": {"x": 0.0, "y": 0.0},
-            "right_control": {"x": 0.0, "y": 0.0},
-            # 自定义属性
-            "id": self.kf_id,
-            "time_offset": self.time_offset,
-            "values": self.values
-        }
+        return dict(self._EXPORT_SKELETON, left_control={"x": 0.0, "y": 0.0}, right_control={"x": 0.0, "y": 0.0},
+                    id=self.kf_id, time_offset=self.time_offset, values=self.values)
+
+class Keyframe_record(NamedTuple):
+    """关键帧列表中一个关键帧的只读记录"""
+
+    kf_id: str
+    """关键帧全局id"""
+    time_offset: int
+    """相对于素材起始点的时间偏移量"""
+    values: Tuple[float, ...]
+    """关键帧的值, 与`Keyframe.values`相同, 一般只有一个元素"""
 
 class Keyframe_property(Enum):
     """关键帧所控制的属性类型"""
@@ -54,33 +74,106 @@ class Keyframe_property(Enum):
 
     volume = "KFTypeVolume"
 
-class Keyframe_list:
-    """关键帧列表, 记录与某个特定属性相关的一系列关键帧"""
+_COMPATIBLE_FORMATS = {"q": ("q", "l"), "d": ("d",)}
+"""可直接按字节复制的缓冲区格式, 还需检查元素大小是否相同"""
+
+def _as_array(typecode: str, values: Sequence[Any]) -> "array[Any]":
+    """将序列转换为给定类型的数组, 内存布局相符的数组(如NumPy的int64及float64数组)直接按字节复制"""
+    result = array(typecode)
+    try:
+        memory = memoryview(values)  # type: ignore[arg-type]
+    except TypeError:
+        memory = None
+    if memory is not None and memory.ndim == 1 and memory.c_contiguous and memory.itemsize == result.itemsize \
+            and memory.format.lstrip("@=") in _COMPATIBLE_FORMATS[typecode]:
+        result.frombytes(memory.cast("B"))
+    else:
+        result.extend(values)
+    return result
+
+class Keyframe_list(Exportable):
+    """关键帧列表, 记录与某个特定属性相关的一系列关键帧
+
+    各关键帧按时间偏移量升序存放在并列的数组中, 时间偏移量相同的关键帧保持加入的先后顺序
+    """
+
+    __slots__ = ("list_id", "keyframe_property", "kf_ids", "time_offsets", "values")
 
     list_id: str
     """关键帧列表全局id, 自动生成"""
     keyframe_property: Keyframe_property
     """关键帧对应的属性"""
-    keyframes: List[Keyframe]
-    """关键帧列表"""
+
+    kf_ids: List[str]
+    """各关键帧的全局id"""
+    time_offsets: "array[int]"
+    """各关键帧相对于素材起始点的时间偏移量, 单位为微秒"""
+    values: "array[float]"
+    """各关键帧的值"""
 
     def __init__(self, keyframe_property: Keyframe_property):
         """为给定的关键帧属性初始化关键帧列表"""
-        self.list_id = uuid.uuid4().hex
+        self.list_id = new_id()
 
         self.keyframe_property = keyframe_property
-        self.keyframes = []
+        self.kf_ids = []
+        self.time_offsets = array("q")
+        self.values = array("d")
+
+    def __len__(self) -> int:
+        return len(self.time_offsets)
+
+    @property
+    def keyframes(self) -> Tuple[Keyframe_record, ...]:
+        """按时间顺序排列的关键帧的只读记录, 添加关键帧须通过`add_keyframe`或`add_keyframes`"""
+        return tuple(Keyframe_record(kf_id, time_offset, (value,))
+                     for kf_id, time_offset, value in zip(self.kf_ids, self.time_offsets, self.values))
 
-    def add_keyframe(self, time_offset: int, value: float):
+    def add_keyframe(self, time_offset: int, value: float) -> None:
         """给定时间偏移量及关键值, 向此关键帧列表中添加一个关键帧"""
-        keyframe = Keyframe(time_offset, value)
-        self.keyframes.append(keyframe)
-        self.keyframes.sort(key=lambda x: x.time_offset)
+        index = bisect.bisect_right(self.time_offsets, time_offset)
+        self.time_offsets.insert(index, time_offset)
+        self.values.insert(index, value)
+        self.kf_ids.insert(index, new_id())
+        self.touch()
+
+    def add_keyframes(self, time_offsets: Sequence[int], values: Sequence[float]) -> None:
+        """批量添加关键帧, 结果与按顺序逐个调用`add_keyframe`相同
+
+        Args:
+            time_offsets (`Sequence[int]`): 各关键帧的时间偏移量, 单位为微秒, 可以为列表或NumPy数组等
+            values (`Sequence[float]`): 各关键帧的值, 长度应与`time_offsets`相同
+
+        Raises:
+            `ValueError`: 两序列的长度不同
+        """
+        new_offsets, new_values = _as_array("q", time_offsets), _as_array("d", values)
+        if len(new_offsets) != len(new_values):
+            raise ValueError("时间偏移量与值的数量不同 (%d != %d)" % (len(new_offsets), len(new_values)))
+        new_ids = [new_id() for _ in range(len(new_offsets))]
+
+        offsets = self.time_offsets + new_offsets
+        if all(offsets[i] <= offsets[i + 1] for i in range(max(len(self.time_offsets) - 1, 0), len(offsets) - 1)):
+            # 新关键帧已有序且均不早于已有的关键帧, 直接追加
+            self.time_offsets = offsets
+            self.values.extend(new_values)
+            self.kf_ids.extend(new_ids)
+        else:
+            # 稳定排序, 使时间偏移量相同的关键帧保持加入顺序
+            order = sorted(range(len(offsets)), key=offsets.__getitem__)
+            all_values, all_ids = self.values + new_values, self.kf_ids + new_ids
+            self.time_offsets = array("q", map(offsets.__getitem__, order))
+            self.values = array("d", map(all_values.__getitem__, order))
+            self.kf_ids = list(map(all_ids.__getitem__, order))
+        self.touch()
 
     def export_json(self) -> Dict[str, Any]:
+        skeleton = Keyframe._EXPORT_SKELETON
         return {
             "id": self.list_id,
-            "keyframe_list": [kf.export_json() for kf in self.keyframes],
+            "keyframe_list": [dict(skeleton, left_control={"x": 0.0, "y": 0.0}, right_control={"x": 0.0, "y": 0.0},
+                                   id=kf_id, time_offset=time_offset, values=[value])
+                              for kf_id, time_offset, value in zip(self.kf_ids, self.time_offsets, self.values)],
             "material_id": "",
             "property_type": self.keyframe_property.value
         }
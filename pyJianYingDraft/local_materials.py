@@ -1,13 +1,103 @@
 import os
+import time
 import uuid
+import pickle
+import functools
+import threading
+import multiprocessing
 import pymediainfo
 
-from typing import Optional, Literal
-from typing import Dict, Any
+from collections import deque
+from multiprocessing.connection import Connection, wait
 
-class Crop_settings:
+from typing import Optional, Literal, Callable, Union
+from typing import Type, Iterable, Dict, List, Tuple, Any
+
+from .export_cache import Exportable
+from .probe_cache import Probe_cache, Probe_result, get_probe_cache, set_probe_cache
+from .media_header import probe_video_header, probe_audio_header
+
+def canonical_path(path: str) -> str:
+    """返回文件的规范路径, 指向同一文件的不同写法(相对路径、符号链接等)将得到相同的结果"""
+    return os.path.normcase(os.path.realpath(path))
+
+def file_fingerprint(path: str) -> Tuple[int, int]:
+    """返回文件的(大小, 修改时间), 用于判断文件内容是否发生了变化"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+def material_id_for(path: str, material_name: str) -> str:
+    """根据素材文件的规范路径及素材名称生成素材id, 同名的不同文件不会冲突"""
+    return uuid.uuid3(uuid.NAMESPACE_URL, canonical_path(path) + "#" + material_name).hex
+
+@functools.lru_cache(maxsize=None)
+def _mediainfo_available() -> bool:
+    """检查libmediainfo是否可用, 每个进程只实际检查一次"""
+    return pymediainfo.MediaInfo.can_parse()
+
+def _probe_video(path: str) -> Probe_result:
+    """探测视频(或图片)素材的类型、时长及尺寸, 优先直接读取文件头部, 无法识别时使用pymediainfo"""
+    result = probe_video_header(path)
+    return result if result is not None else _probe_video_mediainfo(path)
+
+def _probe_audio(path: str) -> Probe_result:
+    """探测音频素材的时长, 优先直接读取文件头部, 无法识别时使用pymediainfo"""
+    result = probe_audio_header(path)
+    return result if result is not None else _probe_audio_mediainfo(path)
+
+def _probe_video_mediainfo(path: str) -> Probe_result:
+    """使用pymediainfo探测视频(或图片)素材的类型、时长及尺寸"""
+    postfix = os.path.splitext(path)[1]
+    if not _mediainfo_available():
+        raise ValueError(f"不支持的视频素材类型 '{postfix}'")
+
+    info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
+    # 有视频轨道的视为视频素材
+    if len(info.video_tracks):
+        return Probe_result("video", int(info.video_tracks[0].duration * 1e3),  # type: ignore
+                            info.video_tracks[0].width, info.video_tracks[0].height)  # type: ignore
+    # gif文件使用imageio库获取长度
+    elif postfix.lower() == ".gif":
+        import imageio
+        gif = imageio.get_reader(path)
+        duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
+        gif.close()
+        return Probe_result("video", duration, info.image_tracks[0].width, info.image_tracks[0].height)  # type: ignore
+    elif len(info.image_tracks):
+        return Probe_result("photo", 10800000000,  # 相当于3h
+                            info.image_tracks[0].width, info.image_tracks[0].height)  # type: ignore
+    else:
+        raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+
+def _probe_audio_mediainfo(path: str) -> Probe_result:
+    """使用pymediainfo探测音频素材的时长"""
+    if not _mediainfo_available():
+        raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
+    info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
+    if len(info.video_tracks):
+        raise ValueError("音频素材不应包含视频轨道")
+    if not len(info.audio_tracks):
+        raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
+    return Probe_result("audio", int(info.audio_tracks[0].duration * 1e3), 0, 0)  # type: ignore
+
+def _cached_probe(path: str, kind: Literal["video", "audio"], prober: Callable[[str], Probe_result]) -> Probe_result:
+    """探测素材文件, 若启用了探测结果缓存则优先从缓存中读取"""
+    cache = get_probe_cache()
+    if cache is None:
+        return prober(path)
+
+    result = cache.get(path, kind)
+    if result is None:
+        result = prober(path)
+        cache.put(path, kind, result)
+    return result
+
+class Crop_settings(Exportable):
     """素材的裁剪设置, 各属性均在0-1之间, 注意素材的坐标原点在左上角"""
 
+    __slots__ = ("upper_left_x", "upper_left_y", "upper_right_x", "upper_right_y", "lower_left_x",
+                 "lower_left_y", "lower_right_x", "lower_right_y")
+
     upper_left_x: float
     upper_left_y: float
     upper_right_x: float
@@ -43,11 +133,11 @@ class Crop_settings:
             "lower_right_y": self.lower_right_y
         }
 
-class Video_material:
+class Video_material(Exportable):
     """本地视频素材（视频或图片）, 一份素材可以在多个片段中使用"""
 
     material_id: str
-    """素材全局id, 自动生成"""
+    """素材全局id, 根据文件路径及素材名称自动生成"""
     local_material_id: str
     """素材本地id, 意义暂不明确"""
     material_name: str
@@ -65,53 +155,68 @@ class Video_material:
     material_type: Literal["video", "photo"]
     """素材类型: 视频或图片"""
 
-    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: Crop_settings = Crop_settings()):
+    _PROBED_ATTRS = ("material_type", "duration", "width", "height")
+
+    def __init__(self, path: str, material_name: Optional[str] = None, crop_settings: Crop_settings = Crop_settings(), *,
+                 lazy: bool = False):
         """从指定位置加载视频（或图片）素材
 
         Args:
             path (`str`): 素材文件路径, 支持mp4, mov, avi等常见视频文件及jpg, jpeg, png等图片文件.
             material_name (`str`, optional): 素材名称, 如果不指定, 默认使用文件名作为素材名称.
             crop_settings (`Crop_settings`, optional): 素材裁剪设置, 默认不裁剪.
+            lazy (`bool`, optional): 是否推迟探测素材文件, 默认为否. 若为是, 则仅检查文件是否存在,
+                直到首次访问`duration`, `width`, `height`或`material_type`时才进行探测, 也可通过`prefetch_materials`批量探测.
 
         Raises:
             `FileNotFoundError`: 素材文件不存在.
-            `ValueError`: 不支持的素材文件类型.
+            `ValueError`: 不支持的素材文件类型. 延迟探测时将在首次访问相关属性时抛出.
         """
         path = os.path.abspath(path)
-        postfix = os.path.splitext(path)[1]
         if not os.path.exists(path):
             raise FileNotFoundError(f"找不到 {path}")
 
+        self._init_attrs(path, material_name, crop_settings)
+        if not lazy:
+            self._probe()
+
+    def __getattr__(self, name: str) -> Any:
+        # 仅在属性不存在, 即延迟探测的素材尚未探测时被调用
+        if name not in self._PROBED_ATTRS or "path" not in self.__dict__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        self._probe()
+        return self.__dict__[name]
+
+    @property
+    def probed(self) -> bool:
+        """素材文件是否已被探测"""
+        return "duration" in self.__dict__
+
+    def _init_attrs(self, path: str, material_name: Optional[str], crop_settings: Crop_settings) -> None:
         self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, self.material_name).hex
+        self.material_id = material_id_for(path, self.material_name)
         self.path = path
         self.crop_settings = crop_settings
         self.local_material_id = ""
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError(f"不支持的视频素材类型 '{postfix}'")
-
-        info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
-        # 有视频轨道的视为视频素材
-        if len(info.video_tracks):
-            self.material_type = "video"
-            self.duration = int(info.video_tracks[0].duration * 1e3)  # type: ignore
-            self.width, self.height = info.video_tracks[0].width, info.video_tracks[0].height  # type: ignore
-        # gif文件使用imageio库获取长度
-        elif postfix.lower() == ".gif":
-            import imageio
-            gif = imageio.get_reader(path)
-
-            self.material_type = "video"
-            self.duration = int(round(gif.get_meta_data()['duration'] * gif.get_length() * 1e3))
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-            gif.close()
-        elif len(info.image_tracks):
-            self.material_type = "photo"
-            self.duration = 10800000000  # 相当于3h
-            self.width, self.height = info.image_tracks[0].width, info.image_tracks[0].height  # type: ignore
-        else:
-            raise ValueError(f"输入的素材文件 {path} 没有视频轨道或图片轨道")
+    def _probe(self) -> None:
+        """(重新)探测素材文件"""
+        self._assign_probe(_cached_probe(self.path, "video", _probe_video))
+
+    def _assign_probe(self, probe: Probe_result) -> None:
+        self.material_type = probe.material_type  # type: ignore
+        self.duration = probe.duration
+        self.width, self.height = probe.width, probe.height
+        self.touch()
+
+    @classmethod
+    def _from_probe(cls, path: str, probe: Probe_result, material_name: Optional[str] = None,
+                    crop_settings: Crop_settings = Crop_settings()) -> "Video_material":
+        """利用已有的探测结果构造素材, 不再重复探测"""
+        obj = cls.__new__(cls)
+        obj._init_attrs(os.path.abspath(path), material_name, crop_settings)
+        obj._assign_probe(probe)
+        return obj
 
     def export_json(self) -> Dict[str, Any]:
         video_material_json = {
@@ -135,11 +240,11 @@ class Video_material:
         }
         return video_material_json
 
-class Audio_material:
+class Audio_material(Exportable):
     """本地音频素材"""
 
     material_id: str
-    """素材全局id, 自动生成"""
+    """素材全局id, 根据文件路径及素材名称自动生成"""
     material_name: str
     """素材名称"""
     path: str
@@ -148,71 +253,326 @@ class Audio_material:
     duration: int
     """素材时长, 单位为微秒"""
 
-    def __init__(self, path: str, material_name: Optional[str] = None):
+    _PROBED_ATTRS = ("duration",)
+
+    def __init__(self, path: str, material_name: Optional[str] = None, *, lazy: bool = False):
         """从指定位置加载音频素材, 注意视频文件不应该作为音频素材使用
 
         Args:
             path (`str`): 素材文件路径, 支持mp3, wav等常见音频文件.
             material_name (`str`, optional): 素材名称, 如果不指定, 默认使用文件名作为素材名称.
+            lazy (`bool`, optional): 是否推迟探测素材文件, 默认为否. 若为是, 则仅检查文件是否存在,
+                直到首次访问`duration`时才进行探测, 也可通过`prefetch_materials`批量探测.
 
         Raises:
             `FileNotFoundError`: 素材文件不存在.
-            `ValueError`: 不支持的素材文件类型.
+            `ValueError`: 不支持的素材文件类型. 延迟探测时将在首次访问`duration`时抛出.
         """
         path = os.path.abspath(path)
         if not os.path.exists(path):
             raise FileNotFoundError(f"找不到 {path}")
 
+        self._init_attrs(path, material_name)
+        if not lazy:
+            self._probe()
+
+    def __getattr__(self, name: str) -> Any:
+        # 仅在属性不存在, 即延迟探测的素材尚未探测时被调用
+        if name not in self._PROBED_ATTRS or "path" not in self.__dict__:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        self._probe()
+        return self.__dict__[name]
+
+    @property
+    def probed(self) -> bool:
+        """素材文件是否已被探测"""
+        return "duration" in self.__dict__
+
+    def _init_attrs(self, path: str, material_name: Optional[str]) -> None:
         self.material_name = material_name if material_name else os.path.basename(path)
-        self.material_id = uuid.uuid3(uuid.NAMESPACE_DNS, self.material_name).hex
+        self.material_id = material_id_for(path, self.material_name)
         self.path = path
 
-        if not pymediainfo.MediaInfo.can_parse():
-            raise ValueError("不支持的音频素材类型 %s" % os.path.splitext(path)[1])
-        info: pymediainfo.MediaInfo = pymediainfo.MediaInfo.parse(path)  # type: ignore
-        if len(info.video_tracks):
-            raise ValueError("音频素材不应包含视频轨道")
-        if not len(info.audio_tracks):
-            raise ValueError(f"给定的素材文件 {path} 没有音频轨道")
-        self.duration = int(info.audio_tracks[0].duration * 1e3)  # type: ignore
+    def _probe(self) -> None:
+        """(重新)探测素材文件"""
+        self._assign_probe(_cached_probe(self.path, "audio", _probe_audio))
+
+    def _assign_probe(self, probe: Probe_result) -> None:
+        self.duration = probe.duration
+        self.touch()
+
+    @classmethod
+    def _from_probe(cls, path: str, probe: Probe_result, material_name: Optional[str] = None) -> "Audio_material":
+        """利用已有的探测结果构造素材, 不再重复探测"""
+        obj = cls.__new__(cls)
+        obj._init_attrs(os.path.abspath(path), material_name)
+        obj._assign_probe(probe)
+        return obj
+
+    _EXPORT_SKELETON: Dict[str, Any] = {
+        "app_id": 0,
+        "category_id": "",
+        "category_name": "local",
+        "check_flag": 1,
+        "copyright_limit_type": "none",
+        "duration": None,
+        "effect_id": "",
+        "formula_id": "",
+        "id": None,
+        "intensifies_path": "",
+        "is_ai_clone_tone": False,
+        "is_text_edit_overdub": False,
+        "is_ugc": False,
+        "local_material_id": None,
+        "music_id": None,
+        "name": None,
+        "path": None,
+        "query": "",
+        "request_id": "",
+        "resource_id": "",
+        "search_id": "",
+        "source_from": "",
+        "source_platform": 0,
+        "team_id": "",
+        "text_id": "",
+        "tone_category_id": "",
+        "tone_category_name": "",
+        "tone_effect_id": "",
+        "tone_effect_name": "",
+        "tone_platform": "",
+        "tone_second_category_id": "",
+        "tone_second_category_name": "",
+        "tone_speaker": "",
+        "tone_type": "",
+        "type": "extract_music",
+        "video_id": "",
+        "wave_points": None
+    }
+    """导出结果中的常量部分, 各变量字段及嵌套的列表仅占位以保持键的顺序, 每次导出时重新生成"""
 
     def export_json(self) -> Dict[str, Any]:
-        return {
-            "app_id": 0,
-            "category_id": "",
-            "category_name": "local",
-            "check_flag": 1,
-            "copyright_limit_type": "none",
+        ret = dict(self._EXPORT_SKELETON)
+        ret.update({
             "duration": self.duration,
-            "effect_id": "",
-            "formula_id": "",
             "id": self.material_id,
-            "intensifies_path": "",
-            "is_ai_clone_tone": False,
-            "is_text_edit_overdub": False,
-            "is_ugc": False,
             "local_material_id": self.material_id,
             "music_id": self.material_id,
             "name": self.material_name,
             "path": self.path,
-            "query": "",
-            "request_id": "",
-            "resource_id": "",
-            "search_id": "",
-            "source_from": "",
-            "source_platform": 0,
-            "team_id": "",
-            "text_id": "",
-            "tone_category_id": "",
-            "tone_category_name": "",
-            "tone_effect_id": "",
-            "tone_effect_name": "",
-            "tone_platform": "",
-            "tone_second_category_id": "",
-            "tone_second_category_name": "",
-            "tone_speaker": "",
-            "tone_type": "",
-            "type": "extract_music",
-            "video_id": "",
-            "wave_points": []
-        }
+            "wave_points": [],
+        })
+        return ret
+
+_TASK_STARTED = "started"
+"""工作进程/线程开始执行一个探测任务时发送的消息"""
+
+def _probe_worker_main(conn: Connection, kind: Literal["video", "audio"], init_cache: bool,
+                       cache: Optional[Probe_cache]) -> None:
+    """工作进程/线程的主循环: 逐个接收文件路径并返回探测结果或异常对象, 收到None或连接关闭时退出
+
+    工作进程还会随每个结果一并返回此次探测中缓存的命中/未命中次数, 以便调用方将其计入自己的缓存统计
+    """
+    if init_cache:
+        set_probe_cache(cache)
+        if cache is not None:
+            cache._take_counts()  # 以fork方式启动时, 缓存对象带有调用方已有的计数
+    prober = _probe_video if kind == "video" else _probe_audio
+    try:
+        while True:
+            path = conn.recv()
+            if path is None:
+                return
+            conn.send(_TASK_STARTED)
+            try:
+                result: Any = _cached_probe(path, kind, prober)
+            except Exception as e:
+                result = e
+            counts = cache._take_counts() if init_cache and cache is not None else None
+            try:
+                conn.send((result, counts))
+            except (TypeError, AttributeError, pickle.PicklingError):  # 异常对象无法序列化
+                conn.send((ValueError("探测素材 %s 失败: %r" % (path, result)), counts))
+    except (EOFError, OSError):  # 调用方已放弃此工作进程/线程
+        return
+
+class _Probe_worker:
+    """执行探测任务的一个工作进程或线程, 通过管道逐个接收任务"""
+
+    conn: Connection
+    """与工作进程/线程通信的连接"""
+    runner: Union[multiprocessing.Process, threading.Thread]
+    """工作进程或线程"""
+    task: Optional[int]
+    """正在执行的任务下标, 空闲时为None"""
+    deadline: Optional[float]
+    """正在执行的任务的截止时间(`time.monotonic`), 任务尚未开始或不限时时为None"""
+
+    def __init__(self, kind: Literal["video", "audio"], executor: Literal["process", "thread"]):
+        self.conn, child_conn = multiprocessing.Pipe()
+        if executor == "process":
+            self.runner = multiprocessing.Process(target=_probe_worker_main, daemon=True,
+                                                  args=(child_conn, kind, True, get_probe_cache()))
+        else:
+            # 线程与调用方共享探测结果缓存, 无需另行设置
+            self.runner = threading.Thread(target=_probe_worker_main, daemon=True,
+                                           args=(child_conn, kind, False, None))
+        self.runner.start()
+        if executor == "process":
+            child_conn.close()
+        self.task = None
+        self.deadline = None
+
+    def submit(self, task: int, path: str) -> None:
+        self.conn.send(path)
+        self.task = task
+        self.deadline = None
+
+    def stop(self, kill: bool) -> None:
+        """结束工作进程/线程. 卡住的工作线程无法被终止, 只能被丢弃并在后台运行至探测结束"""
+        if kill and isinstance(self.runner, multiprocessing.Process):
+            self.runner.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.conn.close()
+
+def _probe_many(paths: List[str], kind: Literal["video", "audio"], workers: int, timeout: Optional[float],
+                executor: Literal["process", "thread"]) -> List[Any]:
+    """并行探测一批素材文件, 返回与输入一一对应的探测结果或异常对象
+
+    每个文件的超时时间从其探测实际开始时计算. 探测超时或意外退出的工作进程/线程将被丢弃并由新的工作进程/线程代替,
+    因此卡住的文件不会影响排在其后的文件
+    """
+    if workers <= 0:
+        raise ValueError("workers 必须为正数")
+    if executor not in ("process", "thread"):
+        raise ValueError(f"Unsupported executor: {executor}")
+
+    results: List[Any] = []
+    for path in paths:
+        results.append(None if os.path.exists(path) else FileNotFoundError(f"找不到 {path}"))
+    queue = deque(i for i, ret in enumerate(results) if ret is None)
+
+    cache = get_probe_cache()
+    pool: List[_Probe_worker] = []
+    try:
+        while True:
+            # 为空闲的工作进程/线程分配任务, 不足时创建新的
+            for worker in pool:
+                if worker.task is None and len(queue) > 0:
+                    task = queue.popleft()
+                    worker.submit(task, paths[task])
+            while len(pool) < workers and len(queue) > 0:
+                worker = _Probe_worker(kind, executor)
+                pool.append(worker)
+                task = queue.popleft()
+                worker.submit(task, paths[task])
+
+            busy = [worker for worker in pool if worker.task is not None]
+            if len(busy) == 0:
+                break
+            deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+            wait_time = None if len(deadlines) == 0 else max(0.0, min(deadlines) - time.monotonic())
+            ready = wait([worker.conn for worker in busy], wait_time)
+
+            now = time.monotonic()
+            for worker in busy:
+                task = worker.task
+                assert task is not None
+                if worker.conn in ready:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        results[task] = RuntimeError(f"探测素材 {paths[task]} 时工作进程意外退出")
+                        worker.stop(kill=True)
+                        pool.remove(worker)
+                        continue
+                    if message == _TASK_STARTED:
+                        worker.deadline = None if timeout is None else now + timeout
+                    else:
+                        results[task], counts = message  # 探测结果或异常对象, 以及工作进程中缓存的命中/未命中次数
+                        if counts is not None and cache is not None:
+                            cache._add_counts(*counts)
+                        worker.task = None
+                elif worker.deadline is not None and now >= worker.deadline:
+                    results[task] = TimeoutError(f"探测素材 {paths[task]} 超时")
+                    worker.stop(kill=True)
+                    pool.remove(worker)
+    finally:
+        for worker in pool:
+            worker.stop(kill=worker.task is not None)
+
+    return results
+
+def load_materials(paths: Iterable[str], material_class: Type[Union[Video_material, Audio_material]] = Video_material, *,
+                   workers: int = 4, timeout: Optional[float] = 60.0,
+                   executor: Literal["process", "thread"] = "process",
+                   return_exceptions: bool = False) -> List[Any]:
+    """并行地加载一批同类型的本地素材, 返回的素材列表与输入的路径一一对应
+
+    若启用了探测结果缓存(`set_probe_cache`), 工作进程/线程同样会使用该缓存, 其中的命中/未命中次数也会计入调用方的`Probe_cache.stats`
+
+    Args:
+        paths (`Iterable[str]`): 素材文件路径
+        material_class (`Type[Video_material]` or `Type[Audio_material]`, optional): 素材类型, 默认为`Video_material`
+        workers (`int`, optional): 并行的工作进程/线程数, 默认为4
+        timeout (`float`, optional): 单个素材探测的最长时间, 从该素材的探测实际开始时计算, 单位为秒, 默认为60秒. None表示不限时.
+        executor (`"process"` or `"thread"`, optional): 使用进程池或线程池, 默认为进程池.
+            超时的工作进程会被终止并由新进程代替; 超时的线程无法被终止, 只会被丢弃并由新线程代替, 它会在后台运行至探测结束.
+        return_exceptions (`bool`, optional): 是否将加载失败的异常放在结果列表的相应位置而非直接抛出, 默认为否
+
+    Returns:
+        `List`: 加载出的素材列表, 若`return_exceptions`为真, 则加载失败的位置为相应的异常对象
+
+    Raises:
+        `TypeError`: 错误的素材类型
+        `FileNotFoundError`: 素材文件不存在
+        `ValueError`: 不支持的素材文件类型
+        `TimeoutError`: 探测某个素材文件超时
+    """
+    if material_class is Video_material:
+        kind: Literal["video", "audio"] = "video"
+    elif material_class is Audio_material:
+        kind = "audio"
+    else:
+        raise TypeError("错误的素材类型: '%s'" % material_class)
+
+    paths = [os.path.abspath(path) for path in paths]
+    results = _probe_many(paths, kind, workers, timeout, executor)
+
+    for i, ret in enumerate(results):
+        if isinstance(ret, Exception):
+            if not return_exceptions:
+                raise ret
+        else:
+            results[i] = material_class._from_probe(paths[i], ret)
+    return results
+
+def prefetch_materials(materials: Iterable[Union[Video_material, Audio_material]], *,
+                       workers: int = 4, timeout: Optional[float] = 60.0,
+                       executor: Literal["process", "thread"] = "process") -> None:
+    """并行地探测一批延迟加载(`lazy=True`)且尚未探测的素材, 已探测的素材将被跳过
+
+    Args:
+        materials (`Iterable[Video_material | Audio_material]`): 待探测的素材
+        workers (`int`, optional): 并行的工作进程/线程数, 默认为4
+        timeout (`float`, optional): 单个素材探测的最长时间, 从该素材的探测实际开始时计算, 单位为秒, 默认为60秒. None表示不限时.
+        executor (`"process"` or `"thread"`, optional): 使用进程池或线程池, 默认为进程池.
+
+    Raises:
+        `ValueError`: 不支持的素材文件类型
+        `TimeoutError`: 探测某个素材文件超时
+    """
+    materials = list(materials)
+    for kind, material_class in (("video", Video_material), ("audio", Audio_material)):
+        pending = [mat for mat in materials if isinstance(mat, material_class) and not mat.probed]
+        if len(pending) == 0:
+            continue
+
+        results = _probe_many([mat.path for mat in pending], kind, workers, timeout, executor)  # type: ignore
+        for mat, ret in zip(pending, results):
+            if isinstance(ret, Exception):
+                raise ret
+            mat._assign_probe(ret)
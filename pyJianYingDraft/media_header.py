@@ -0,0 +1,263 @@
+"""直接读取常见媒体文件的容器头部以获取其时长及尺寸, 无需经过libmediainfo或解码
+
+支持MP4/MOV, PNG, JPEG, GIF, WAV及VBR编码的MP3, 无法识别或解析失败时返回None, 由调用方回退至pymediainfo
+"""
+
+import os
+import struct
+
+from typing import Optional, BinaryIO
+from typing import Iterator, Tuple
+
+from .probe_cache import Probe_result
+
+PHOTO_DURATION = 10800000000
+"""图片素材的默认时长, 相当于3h"""
+
+def _ms_to_us(ms: float) -> int:
+    """与libmediainfo的处理方式保持一致: 时长先舍入到整毫秒, 再转换为微秒"""
+    return int(round(ms)) * 1000
+
+# MP4/MOV
+
+def _iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """遍历[start, end)范围内的ISO BMFF box, 返回(类型, 数据起始位置, 数据结束位置)"""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        payload = pos + 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            payload += 8
+        elif size == 0:
+            size = end - pos
+        if size < payload - pos:
+            return
+        yield box_type, payload, min(pos + size, end)
+        pos += size
+
+def _find_box(f: BinaryIO, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    for t, payload, box_end in _iter_boxes(f, start, end):
+        if t == box_type:
+            return payload, box_end
+    return None
+
+def _probe_mp4(f: BinaryIO, file_size: int) -> Optional[Probe_result]:
+    moov = _find_box(f, 0, file_size, b"moov")
+    if moov is None:
+        return None
+
+    for box_type, trak_start, trak_end in _iter_boxes(f, *moov):
+        if box_type != b"trak":
+            continue
+        mdia = _find_box(f, trak_start, trak_end, b"mdia")
+        tkhd = _find_box(f, trak_start, trak_end, b"tkhd")
+        if mdia is None or tkhd is None:
+            continue
+        hdlr = _find_box(f, *mdia, b"hdlr")
+        mdhd = _find_box(f, *mdia, b"mdhd")
+        if hdlr is None or mdhd is None:
+            continue
+        f.seek(hdlr[0] + 8)  # version/flags + pre_defined
+        if f.read(4) != b"vide":
+            continue
+
+        # 视频轨道的时长取自mdhd
+        f.seek(mdhd[0])
+        version = f.read(1)[0]
+        f.seek(mdhd[0] + (20 if version == 1 else 12))
+        if version == 1:
+            timescale, duration = struct.unpack(">IQ", f.read(12))
+        else:
+            timescale, duration = struct.unpack(">II", f.read(8))
+        # 宽高取自tkhd, 为16.16定点数
+        f.seek(tkhd[1] - 8)
+        width, height = struct.unpack(">II", f.read(8))
+        width, height = width >> 16, height >> 16
+
+        if timescale == 0 or width == 0 or height == 0:
+            return None
+        return Probe_result("video", _ms_to_us(duration * 1000 / timescale), width, height)
+    return None
+
+# 图片
+
+def _probe_png(f: BinaryIO) -> Optional[Probe_result]:
+    f.seek(8)
+    length, chunk_type, width, height = struct.unpack(">I4sII", f.read(16))
+    if chunk_type != b"IHDR":
+        return None
+    return Probe_result("photo", PHOTO_DURATION, width, height)
+
+def _probe_jpeg(f: BinaryIO) -> Optional[Probe_result]:
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code == 0xFF:  # 填充字节
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if code == 0xD8 or 0xD0 <= code <= 0xD7 or code == 0x01:  # 无数据段的标记
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        # SOF0~SOF15, 除去DHT(C4), JPG(C8)及DAC(CC)
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            _precision, height, width = struct.unpack(">BHH", f.read(5))
+            if width == 0 or height == 0:
+                return None
+            return Probe_result("photo", PHOTO_DURATION, width, height)
+        if code == 0xDA:  # 在SOF之前就遇到了图像数据
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+def _skip_sub_blocks(f: BinaryIO) -> bool:
+    while True:
+        size = f.read(1)
+        if len(size) == 0:
+            return False
+        if size[0] == 0:
+            return True
+        f.seek(size[0], os.SEEK_CUR)
+
+def _probe_gif(f: BinaryIO) -> Optional[Probe_result]:
+    """遍历GIF的数据块以统计帧数而不解码图像数据
+
+    与原先基于imageio的实现保持一致, 时长取为首帧延迟乘以帧数
+    """
+    f.seek(6)
+    width, height, flags = struct.unpack("<HHB", f.read(5))
+    f.seek(2, os.SEEK_CUR)
+    if flags & 0x80:  # 全局颜色表
+        f.seek(3 << ((flags & 0x07) + 1), os.SEEK_CUR)
+
+    frame_count = 0
+    first_delay: Optional[int] = None
+    while True:
+        block = f.read(1)
+        if len(block) == 0 or block[0] == 0x3B:  # 文件结束
+            break
+        if block[0] == 0x21:  # 扩展块
+            label = f.read(1)
+            if len(label) == 0:
+                return None
+            if label[0] == 0xF9 and frame_count == 0:  # 首帧的图形控制扩展
+                data = f.read(5)
+                if len(data) < 5:
+                    return None
+                first_delay = struct.unpack("<H", data[2:4])[0]
+            if not _skip_sub_blocks(f):
+                return None
+        elif block[0] == 0x2C:  # 图像描述符
+            descriptor = f.read(9)
+            if len(descriptor) < 9:
+                return None
+            if descriptor[8] & 0x80:  # 局部颜色表
+                f.seek(3 << ((descriptor[8] & 0x07) + 1), os.SEEK_CUR)
+            f.seek(1, os.SEEK_CUR)  # LZW最小码长
+            if not _skip_sub_blocks(f):
+                return None
+            frame_count += 1
+        else:
+            return None
+
+    if first_delay is None or frame_count == 0 or width == 0 or height == 0:
+        return None
+    return Probe_result("video", first_delay * 10000 * frame_count, width, height)  # 延迟的单位为1/100秒
+
+# 音频
+
+def _probe_wav(f: BinaryIO, file_size: int) -> Optional[Probe_result]:
+    byte_rate: Optional[int] = None
+    pos = 12
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        chunk_id, chunk_size = struct.unpack("<4sI", f.read(8))
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<HHII", f.read(12))[3]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            chunk_size = min(chunk_size, file_size - pos - 8)
+            return Probe_result("audio", _ms_to_us(chunk_size * 1000 / byte_rate), 0, 0)
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+_MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+
+def _probe_mp3(f: BinaryIO) -> Optional[Probe_result]:
+    """仅处理带有Xing或VBRI头的MP3文件, 其时长由头部记录的帧数精确给出
+
+    固定码率文件的时长依赖于libmediainfo对流长度的估计方式, 为保证结果一致, 交由pymediainfo处理
+    """
+    # 跳过ID3v2标签
+    start = 0
+    header = f.read(10)
+    if header[:3] == b"ID3":
+        tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+
+    f.seek(start)
+    frame = f.read(4)
+    if len(frame) < 4 or frame[0] != 0xFF or (frame[1] & 0xE0) != 0xE0:
+        return None
+    version_bits, layer_bits = (frame[1] >> 3) & 0x03, (frame[1] >> 1) & 0x03
+    sample_rate_index = (frame[2] >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0 or sample_rate_index == 3:
+        return None
+    version = {3: 1, 2: 2, 0: 25}[version_bits]
+    layer = 4 - layer_bits
+    sample_rate = _MP3_SAMPLE_RATES[version][sample_rate_index]
+    samples_per_frame = 384 if layer == 1 else (1152 if layer == 2 or version == 1 else 576)
+
+    mono = (frame[3] >> 6) == 3
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    f.seek(start + 4 + side_info)
+    tag = f.read(12)
+    if tag[:4] == b"Xing" and struct.unpack(">I", tag[4:8])[0] & 0x01:
+        frames = struct.unpack(">I", tag[8:12])[0]
+        return Probe_result("audio", _ms_to_us(frames * samples_per_frame * 1000 / sample_rate), 0, 0)
+    f.seek(start + 4 + 32)
+    tag = f.read(18)
+    if tag[:4] == b"VBRI":
+        frames = struct.unpack(">I", tag[14:18])[0]
+        return Probe_result("audio", _ms_to_us(frames * samples_per_frame * 1000 / sample_rate), 0, 0)
+    return None
+
+def probe_video_header(path: str) -> Optional[Probe_result]:
+    """读取视频(或图片)文件头部以获取其类型、时长及尺寸, 无法识别时返回None"""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            magic = f.read(12)
+            if magic[4:8] in (b"ftyp", b"moov", b"wide", b"mdat", b"free", b"skip"):
+                return _probe_mp4(f, file_size)
+            if magic[:8] == b"\x89PNG\r\n\x1a\n":
+                return _probe_png(f)
+            if magic[:3] == b"\xff\xd8\xff":
+                return _probe_jpeg(f)
+            if magic[:6] in (b"GIF87a", b"GIF89a"):
+                return _probe_gif(f)
+    except (OSError, struct.error, IndexError):
+        pass
+    return None
+
+def probe_audio_header(path: str) -> Optional[Probe_result]:
+    """读取音频文件头部以获取其时长, 无法识别时返回None"""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            magic = f.read(12)
+            if magic[:4] == b"RIFF" and magic[8:12] == b"WAVE":
+                return _probe_wav(f, file_size)
+            if magic[:3] == b"ID3" or (magic[0] == 0xFF and (magic[1] & 0xE0) == 0xE0):
+                f.seek(0)
+                return _probe_mp3(f)
+    except (OSError, struct.error, IndexError, KeyError):
+        pass
+    return None
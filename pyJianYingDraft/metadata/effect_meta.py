@@ -6,6 +6,8 @@ from typing import TypeVar, Optional
 class Effect_param:
     """特效参数信息"""
 
+    __slots__ = ("name", "default_value", "min_value", "max_value")
+
     name: str
     """参数名称"""
     default_value: float
@@ -24,6 +26,8 @@ class Effect_param:
 class Effect_param_instance(Effect_param):
     """特效参数实例"""
 
+    __slots__ = ("index", "value")
+
     index: int
     """参数索引"""
     value: float
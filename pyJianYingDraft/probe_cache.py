@@ -0,0 +1,195 @@
+"""素材探测结果的持久化缓存
+
+探测(解析)本地素材文件的代价较高, 对于在多个草稿乃至多个进程间反复使用的素材,
+可以启用此缓存, 以(绝对路径, 文件大小, 修改时间)为键复用此前的探测结果
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+from dataclasses import dataclass
+from typing import Optional, Literal
+from typing import Dict, Tuple
+
+@dataclass
+class Probe_result:
+    """一次素材探测的结果"""
+
+    material_type: Literal["video", "photo", "audio"]
+    """素材类型"""
+    duration: int
+    """素材时长, 单位为微秒"""
+    width: int
+    """素材宽度, 音频素材为0"""
+    height: int
+    """素材高度, 音频素材为0"""
+
+class Probe_cache:
+    """基于SQLite的素材探测结果缓存, 可安全地被多个进程同时使用
+
+    缓存条目数超过`max_entries`时, 最久未被访问的条目将被成批淘汰, 使条目数降至`max_entries`的90%.
+    条目数只在本进程的写入可能使其超限时才被重新统计, 故多个进程同时写入时条目数可能暂时略超`max_entries`
+    """
+
+    db_path: str
+    """缓存数据库文件路径"""
+    max_entries: int
+    """最大缓存条目数"""
+    timeout: float
+    """等待数据库锁的最长时间, 单位为秒"""
+
+    hits: int
+    """本进程(及`load_materials`所用的工作进程)内的缓存命中次数"""
+    misses: int
+    """本进程(及`load_materials`所用的工作进程)内的缓存未命中次数"""
+
+    _known_entries: Optional[int]
+    """最近一次统计(或淘汰后)的缓存条目数, 尚未统计时为None"""
+    _pending_puts: int
+    """自最近一次统计以来本进程写入的条目数"""
+
+    def __init__(self, db_path: str, max_entries: int = 100000, *, timeout: float = 30.0):
+        """打开(或创建)一个探测结果缓存
+
+        Args:
+            db_path (`str`): 缓存数据库文件路径, 不存在时自动创建
+            max_entries (`int`, optional): 最大缓存条目数, 默认为100000
+            timeout (`float`, optional): 等待其它进程释放数据库锁的最长时间, 单位为秒, 默认为30秒
+
+        Raises:
+            `ValueError`: `max_entries`不为正数
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries 必须为正数")
+
+        self.db_path = os.path.abspath(db_path)
+        self.max_entries = max_entries
+        self.timeout = timeout
+
+        self.hits = 0
+        self.misses = 0
+        self._known_entries = None
+        self._pending_puts = 0
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        conn = self._connection()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS probe ("
+                         "path TEXT NOT NULL, kind TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                         "material_type TEXT NOT NULL, duration INTEGER NOT NULL, width INTEGER NOT NULL, height INTEGER NOT NULL, "
+                         "last_access REAL NOT NULL, PRIMARY KEY (path, kind))")
+            conn.execute("CREATE INDEX IF NOT EXISTS probe_last_access ON probe (last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前线程(及进程)专用的数据库连接"""
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():  # fork后不能沿用父进程的连接
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def file_key(path: str) -> Tuple[str, int, int]:
+        """计算文件的缓存键, 即(绝对路径, 文件大小, 修改时间)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        return path, stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: str, kind: Literal["video", "audio"]) -> Optional[Probe_result]:
+        """查询文件的探测结果, 文件不存在于缓存中或已被修改时返回None"""
+        path, size, mtime_ns = self.file_key(path)
+        conn = self._connection()
+        row = conn.execute("SELECT size, mtime_ns, material_type, duration, width, height FROM probe "
+                           "WHERE path = ? AND kind = ?", (path, kind)).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with conn:
+            conn.execute("UPDATE probe SET last_access = ? WHERE path = ? AND kind = ?", (time.time(), path, kind))
+        with self._lock:
+            self.hits += 1
+        return Probe_result(row[2], row[3], row[4], row[5])
+
+    def put(self, path: str, kind: Literal["video", "audio"], result: Probe_result) -> None:
+        """写入文件的探测结果, 必要时成批淘汰最久未被访问的条目"""
+        path, size, mtime_ns = self.file_key(path)
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO probe VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (path, kind, size, mtime_ns,
+                          result.material_type, result.duration, result.width, result.height, time.time()))
+            # 已知条目数加上此后写入的条目数是条目数的上界(不计其它进程的写入), 仅在其超限时才需重新统计
+            with self._lock:
+                self._pending_puts += 1
+                if self._known_entries is not None and self._known_entries + self._pending_puts <= self.max_entries:
+                    return
+            count: int = conn.execute("SELECT COUNT(*) FROM probe").fetchone()[0]
+            if count > self.max_entries:
+                # 淘汰至上限的90%, 使下一次统计至少在此后写入max_entries/10个条目后才会发生
+                target = self.max_entries - self.max_entries // 10
+                conn.execute("DELETE FROM probe WHERE rowid IN "
+                             "(SELECT rowid FROM probe ORDER BY last_access LIMIT ?)", (count - target,))
+                count = target
+            with self._lock:
+                self._known_entries = count
+                self._pending_puts = 0
+
+    def clear(self) -> None:
+        """清空缓存并重置命中计数"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM probe")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._known_entries = 0
+            self._pending_puts = 0
+
+    def _take_counts(self) -> Tuple[int, int]:
+        """取出并清零命中/未命中次数, 供工作进程将其汇报给调用方"""
+        with self._lock:
+            counts = (self.hits, self.misses)
+            self.hits = self.misses = 0
+        return counts
+
+    def _add_counts(self, hits: int, misses: int) -> None:
+        """累加工作进程汇报的命中/未命中次数"""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> Dict[str, int]:
+        """返回本进程(及`load_materials`所用的工作进程)内的命中/未命中次数以及当前的缓存条目数"""
+        count: int = self._connection().execute("SELECT COUNT(*) FROM probe").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": count}
+
+    def __getstate__(self) -> Dict[str, object]:
+        # 数据库连接及锁不能跨进程传递
+        state = self.__dict__.copy()
+        del state["_lock"], state["_local"]
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+_active_cache: Optional[Probe_cache] = None
+
+def set_probe_cache(cache: Optional[Probe_cache]) -> None:
+    """设置`Video_material`及`Audio_material`所使用的探测结果缓存, 传入None以禁用缓存(默认禁用)"""
+    global _active_cache
+    _active_cache = cache
+
+def get_probe_cache() -> Optional[Probe_cache]:
+    """获取当前启用的探测结果缓存, 未启用时返回None"""
+    return _active_cache
@@ -1,16 +1,27 @@
+import io
 import os
 import json
+import uuid
+import hashlib
+import functools
+import contextlib
 import warnings
+import itertools
 from copy import deepcopy
 
-from typing import Optional, Literal, Union, overload
-from typing import Type, Dict, List, Any
+from typing import Optional, Literal, Union, Callable, TextIO, ContextManager, TypeVar, overload
+from typing import Type, Dict, List, Set, Tuple, Any, Iterable, Iterator
 
 from . import util
 from . import exceptions
+from .export_cache import Exportable, Cached_export, global_revision, mark_changed, export_cache_enabled
+from .json_codec import get_json_codec
+from .id_provider import Id_provider, Counter_provider, use_id_provider
+from .json_stream import dump_stream
 from .template_mode import Imported_track, Editable_track, Imported_media_track, Imported_text_track, Shrink_mode, Extend_mode, import_track
-from .time_util import Timerange, tim, srt_tstamp
-from .local_materials import Video_material, Audio_material
+from .time_util import Timerange, tim
+from .subtitle import Subtitle_error, read_subtitles
+from .local_materials import Video_material, Audio_material, file_fingerprint, material_id_for
 from .segment import Base_segment, Speed, Clip_settings
 from .audio_segment import Audio_segment, Audio_fade, Audio_effect
 from .video_segment import Video_segment, Sticker_segment, Segment_animations, Video_effect, Transition, Filter
@@ -20,8 +31,35 @@ from .track import Track_type, Base_track, Track
 
 from .metadata import Video_scene_effect_type, Video_character_effect_type, Filter_type
 
+class _Material_list(list):
+    """记录自身被修改次数的列表, 使`Script_material`能够发现对素材列表的直接修改"""
+
+    version: int
+    """列表被修改的次数"""
+
+    def __init__(self, *args: Any):
+        super().__init__(*args)
+        self.version = 0
+
+def _counting_modifier(name: str) -> Callable[..., Any]:
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def modifier(self: _Material_list, *args: Any, **kwargs: Any) -> Any:
+        self.version += 1
+        mark_changed()
+        return method(self, *args, **kwargs)
+    return modifier
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__",
+              "append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(_Material_list, _name, _counting_modifier(_name))
+
 class Script_material:
-    """草稿文件中的素材信息部分"""
+    """草稿文件中的素材信息部分
+
+    各素材列表可被直接修改, 但替换列表对象本身后, 按id的查找将退化为每次重建索引
+    """
 
     audios: List[Audio_material]
     """音频素材列表"""
@@ -50,21 +88,54 @@ class Script_material:
     filters: List[Filter]
     """滤镜效果列表"""
 
+    _INDEXED_TYPES: Dict[type, Tuple[str, str]] = {
+        Video_material: ("videos", "material_id"),
+        Audio_material: ("audios", "material_id"),
+        Audio_fade: ("audio_fades", "fade_id"),
+        Audio_effect: ("audio_effects", "effect_id"),
+        Segment_animations: ("animations", "animation_id"),
+        Video_effect: ("video_effects", "global_id"),
+        Transition: ("transitions", "global_id"),
+        Filter: ("filters", "global_id"),
+    }
+    """可按id索引的素材类型, 及其对应的列表名称和id属性名称"""
+
     def __init__(self):
-        self.audios = []
-        self.videos = []
-        self.stickers = []
-        self.texts = []
+        self.audios = _Material_list()
+        self.videos = _Material_list()
+        self.stickers = _Material_list()
+        self.texts = _Material_list()
+
+        self.audio_effects = _Material_list()
+        self.audio_fades = _Material_list()
+        self.animations = _Material_list()
+        self.video_effects = _Material_list()
+
+        self.speeds = _Material_list()
+        self.masks = _Material_list()
+        self.transitions = _Material_list()
+        self.filters = _Material_list()
+
+        self._id_index: Dict[str, Set[str]] = {list_name: set() for list_name, _ in self._INDEXED_TYPES.values()}
+        self._indexed_version: Dict[str, Tuple[List[Any], int]] = {
+            list_name: (getattr(self, list_name), 0) for list_name in self._id_index
+        }
+        self._fragment_cache: Dict[int, Cached_export] = {}
 
-        self.audio_effects = []
-        self.audio_fades = []
-        self.animations = []
-        self.video_effects = []
+    def _type_info(self, item: Any) -> Tuple[str, str]:
+        info = self._INDEXED_TYPES.get(type(item))
+        if info is None:
+            raise TypeError("Invalid argument type '%s'" % type(item))
+        return info
 
-        self.speeds = []
-        self.masks = []
-        self.transitions = []
-        self.filters = []
+    def _ids(self, list_name: str, id_attr: str) -> Set[str]:
+        """获取指定素材列表的id集合, 若列表曾被直接修改或替换则重建之"""
+        items: List[Any] = getattr(self, list_name)
+        indexed_items, indexed_version = self._indexed_version[list_name]
+        if not isinstance(items, _Material_list) or items is not indexed_items or items.version != indexed_version:
+            self._id_index[list_name] = {getattr(item, id_attr) for item in items}
+            self._indexed_version[list_name] = (items, getattr(items, "version", 0))
+        return self._id_index[list_name]
 
     @overload
     def __contains__(self, item: Union[Video_material, Audio_material]) -> bool: ...
@@ -74,50 +145,73 @@ class Script_material:
     def __contains__(self, item: Union[Segment_animations, Video_effect, Transition, Filter]) -> bool: ...
 
     def __contains__(self, item) -> bool:
-        if isinstance(item, Video_material):
-            return item.material_id in [video.material_id for video in self.videos]
-        elif isinstance(item, Audio_material):
-            return item.material_id in [audio.material_id for audio in self.audios]
-        elif isinstance(item, Audio_fade):
-            return item.fade_id in [fade.fade_id for fade in self.audio_fades]
-        elif isinstance(item, Audio_effect):
-            return item.effect_id in [effect.effect_id for effect in self.audio_effects]
-        elif isinstance(item, Segment_animations):
-            return item.animation_id in [ani.animation_id for ani in self.animations]
-        elif isinstance(item, Video_effect):
-            return item.global_id in [effect.global_id for effect in self.video_effects]
-        elif isinstance(item, Transition):
-            return item.global_id in [transition.global_id for transition in self.transitions]
-        elif isinstance(item, Filter):
-            return item.global_id in [filter_.global_id for filter_ in self.filters]
-        else:
-            raise TypeError("Invalid argument type '%s'" % type(item))
+        list_name, id_attr = self._type_info(item)
+        return getattr(item, id_attr) in self._ids(list_name, id_attr)
+
+    def add(self, item: Union[Video_material, Audio_material, Audio_fade, Audio_effect,
+                              Segment_animations, Video_effect, Transition, Filter]) -> bool:
+        """向相应的素材列表中添加一个素材, 已存在相同id的素材时不作处理
+
+        Returns:
+            `bool`: 是否实际添加了素材
+        """
+        list_name, id_attr = self._type_info(item)
+        ids = self._ids(list_name, id_attr)
+        item_id = getattr(item, id_attr)
+        if item_id in ids:
+            return False
+
+        items: List[Any] = getattr(self, list_name)
+        items.append(item)
+        ids.add(item_id)
+        self._indexed_version[list_name] = (items, getattr(items, "version", 0))
+        return True
 
     def contains_material(self, segment: Union[Video_segment, Sticker_segment, Audio_segment, Text_segment]) -> bool:
         if isinstance(segment, Video_segment):
-            return segment.material_id in [video.material_id for video in self.videos]
+            return segment.material_id in self._ids("videos", "material_id")
         elif isinstance(segment, Audio_segment):
-            return segment.material_id in [audio.material_id for audio in self.audios]
+            return segment.material_id in self._ids("audios", "material_id")
         elif isinstance(segment, (Text_segment, Sticker_segment)):
             return True  # 文本素材和贴纸素材暂不检查
         else:
             raise TypeError("Invalid argument type '%s'" % type(segment))
 
+    def _cached_fragments(self, items: List[Dict[str, Any]]) -> Iterator[Cached_export]:
+        """为以导出形式存储的素材复用其JSON编码结果, 这些素材在加入后不应再被原地修改"""
+        for item in items:
+            cache = self._fragment_cache.get(id(item))
+            if cache is None or cache.data is not item:
+                cache = Cached_export({}, item)
+                self._fragment_cache[id(item)] = cache
+            yield cache
+
     def export_json(self) -> Dict[str, List[Any]]:
+        ret = {key: list(value) for key, value in self._export_lists(lambda item: item.export_json()).items()}
+        # 这几类素材本身即以导出形式存储, 直接返回原列表
+        ret.update({"masks": self.masks, "stickers": self.stickers, "texts": self.texts})
+        return ret
+
+    def export_json_lazy(self) -> Dict[str, Iterable[Any]]:
+        """与`export_json`相同, 但各素材列表以生成器的形式给出, 且尽可能复用缓存的导出结果, 供流式写出使用"""
+        return self._export_lists(lambda item: item.export_cached())
+
+    def _export_lists(self, export: Callable[[Exportable], Any]) -> Dict[str, Iterable[Any]]:
+        """以给定的导出方式构造各素材列表的生成器"""
         return {
             "ai_translates": [],
             "audio_balances": [],
-            "audio_effects": [effect.export_json() for effect in self.audio_effects],
-            "audio_fades": [fade.export_json() for fade in self.audio_fades],
+            "audio_effects": (export(effect) for effect in self.audio_effects),
+            "audio_fades": (export(fade) for fade in self.audio_fades),
             "audio_track_indexes": [],
-            "audios": [audio.export_json() for audio in self.audios],
+            "audios": (export(audio) for audio in self.audios),
             "beats": [],
             "canvases": [],
             "chromas": [],
             "color_curves": [],
             "digital_humans": [],
             "drafts": [],
-            "effects": [_filter.export_json() for _filter in self.filters],
+            "effects": (export(_filter) for _filter in self.filters),
             "flowers": [],
             "green_screens": [],
             "handwrites": [],
@@ -126,8 +220,8 @@ class Script_material:
             "log_color_wheels": [],
             "loudnesses": [],
             "manual_deformations": [],
-            "masks": self.masks,
-            "material_animations": [ani.export_json() for ani in self.animations],
+            "masks": self._cached_fragments(self.masks),
+            "material_animations": (export(ani) for ani in self.animations),
             "material_colors": [],
             "multi_language_refs": [],
             "placeholders": [],
@@ -138,27 +232,82 @@ class Script_material:
             "smart_crops": [],
             "smart_relights": [],
             "sound_channel_mappings": [],
-            "speeds": [spd.export_json() for spd in self.speeds],
-            "stickers": self.stickers,
+            "speeds": (export(spd) for spd in self.speeds),
+            "stickers": self._cached_fragments(self.stickers),
             "tail_leaders": [],
             "text_templates": [],
-            "texts": self.texts,
+            "texts": self._cached_fragments(self.texts),
             "time_marks": [],
-            "transitions": [transition.export_json() for transition in self.transitions],
-            "video_effects": [effect.export_json() for effect in self.video_effects],
+            "transitions": (export(transition) for transition in self.transitions),
+            "video_effects": (export(effect) for effect in self.video_effects),
             "video_trackings": [],
-            "videos": [video.export_json() for video in self.videos],
+            "videos": (export(video) for video in self.videos),
             "vocal_beautifys": [],
             "vocal_separations": []
         }
 
+@functools.lru_cache(maxsize=None)
+def _load_base_template(file_name: str) -> Dict[str, Any]:
+    """解析包内的草稿模板文件, 结果被缓存且不应被修改"""
+    with open(os.path.join(os.path.dirname(__file__), file_name), "rb") as f:
+        return get_json_codec().loads(f.read())
+
+class _Hashing_writer:
+    """将内容转写至另一文件对象, 同时计算其哈希值"""
+
+    def __init__(self, target: TextIO):
+        self.target = target
+        self.hash = hashlib.sha256()
+
+    def write(self, text: str) -> int:
+        self.hash.update(text.encode("utf-8"))
+        self.target.write(text)
+        return len(text)
+
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+def _file_signature(file_path: str) -> Optional[Tuple[int, int]]:
+    """返回文件的(大小, 修改时间), 文件不存在时返回None"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def _fsync_dir(dir_path: str) -> None:
+    """将目录项的变更同步至磁盘, 仅在POSIX系统上有效"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(dir_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # 部分文件系统不支持对目录调用fsync
+    finally:
+        os.close(fd)
+
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+def _with_script_ids(method: _Method) -> _Method:
+    """使方法中创建的对象使用草稿自身的id生成器(若有)"""
+    @functools.wraps(method)
+    def wrapper(self: "Script_file", *args: Any, **kwargs: Any) -> Any:
+        with self.ids():
+            return method(self, *args, **kwargs)
+    return wrapper  # type: ignore
+
+_SEGMENT_TRACK_TYPES: Dict[Type[Base_segment], Track_type] = {
+    t.value.segment_type: t for t in Track_type if t.value.segment_type is not None
+}
+"""片段类型到接受该类型片段的轨道类型的映射"""
+
 class Script_file:
     """剪映草稿文件, 大部分接口定义在此"""
 
     save_path: Optional[str]
     """草稿文件保存路径, 仅在模板模式下有效"""
-    content: Dict[str, Any]
-    """草稿文件内容"""
+    _content: Optional[Dict[str, Any]]
+    """草稿文件内容, 为None时表示尚未从共享的默认模板中复制"""
 
     width: int
     """视频的宽度, 单位为像素"""
@@ -172,24 +321,52 @@ class Script_file:
     materials: Script_material
     """草稿文件中的素材信息部分"""
     tracks: Dict[str, Track]
-    """轨道信息"""
+    """轨道信息, 以轨道名称为键"""
+    tracks_by_type: Dict[Track_type, List[Track]]
+    """按轨道类型索引的轨道列表, 与`tracks`同步维护"""
+
+    material_registry: Dict[str, Tuple[Union[Video_material, Audio_material], Tuple[int, int]]]
+    """已添加的本地素材及其文件指纹(大小, 修改时间), 以素材id(由规范路径及素材名称决定)为键"""
+    id_provider: Optional[Id_provider]
+    """此草稿专用的id生成器, 仅在指定了`id_seed`时存在, 见`ids`方法"""
 
     imported_materials: Dict[str, List[Dict[str, Any]]]
-    """导入的素材信息"""
+    """导入的素材信息, 各素材的数据可能与`content`共享, 修改前须通过`_copy_imported_material`复制"""
     imported_tracks: List[Imported_track]
     """导入的轨道信息"""
+    imported_tracks_by_type: Dict[Track_type, List[Editable_track]]
+    """按轨道类型索引的可修改导入轨道列表, 与`imported_tracks`同步维护"""
+
+    _imported_track_names: Dict[Tuple[Track_type, str], List[Tuple[int, Editable_track]]]
+    """以(轨道类型, 轨道名称)为键的可修改导入轨道及其在同类型导入轨道中的下标"""
+    _imported_material_names: Dict[str, Dict[str, List[int]]]
+    """导入的视频及音频素材在相应列表中的下标, 以素材类型("videos"或"audios")及素材名称为键"""
+    _imported_text_ids: Dict[str, int]
+    """导入的文本素材在相应列表中的下标, 以素材id为键"""
+
+    _last_write: Optional[Tuple[str, Tuple[Any, ...], str, Optional[Tuple[int, int]]]]
+    """上次写入的(文件路径, 草稿状态, 内容哈希值, 写入后的文件大小及修改时间)"""
 
     TEMPLATE_FILE = "draft_content_template.json"
 
-    def __init__(self, width: int, height: int, fps: int = 30):
+    def __init__(self, width: int, height: int, fps: int = 30, *, id_seed: Optional[int] = None):
         """创建一个剪映草稿
 
         Args:
             width (int): 视频宽度, 单位为像素
             height (int): 视频高度, 单位为像素
             fps (int, optional): 视频帧率. 默认为30.
+            id_seed (int, optional): 若指定, 则草稿持有以此为种子的确定性id生成器, 草稿的方法(如`add_track`)及`ids()`范围内创建的
+                片段、关键帧等对象均使用它, 从而使相同的输入生成逐字节相同的草稿. 不影响其它草稿及线程. 默认为None.
         """
+        self._init_fields(width, height, fps)
+        if id_seed is not None:
+            self.id_provider = Counter_provider(id_seed)
+
+    def _init_fields(self, width: int, height: int, fps: int) -> None:
         self.save_path = None
+        self._content = None
+        self.id_provider = None
 
         self.width = width
         self.height = height
@@ -197,51 +374,153 @@ class Script_file:
         self.duration = 0
 
         self.materials = Script_material()
+        self.material_registry = {}
         self.tracks = {}
+        self.tracks_by_type = {}
 
         self.imported_materials = {}
         self.imported_tracks = []
+        self.imported_tracks_by_type = {}
+
+        self._imported_track_names = {}
+        self._imported_material_names = {}
+        self._imported_text_ids = {}
 
-        with open(os.path.join(os.path.dirname(__file__), self.TEMPLATE_FILE), "r", encoding="utf-8") as f:
-            self.content = json.load(f)
+        self._last_write = None
+
+    def ids(self) -> ContextManager[Any]:
+        """返回一个上下文管理器, 在其范围内当前线程创建的片段、关键帧等对象均使用此草稿的id生成器, 未指定`id_seed`时不作任何改变
+
+        例如`with script.ids(): seg = Video_segment(...)`, 草稿自身的方法(如`add_track`)则会自动使用此id生成器
+        """
+        if self.id_provider is None:
+            return contextlib.nullcontext()
+        return use_id_provider(self.id_provider)
+
+    @property
+    def content(self) -> Dict[str, Any]:
+        """草稿文件内容
+
+        默认模板在每个进程中仅解析一次, 新建的草稿在首次访问此属性时才获得其副本
+        """
+        if self._content is None:
+            self._content = util.copy_json(_load_base_template(self.TEMPLATE_FILE))
+        return self._content
+    @content.setter
+    def content(self, value: Dict[str, Any]) -> None:
+        self._content = value
 
     @staticmethod
-    def load_template(json_path: str) -> "Script_file":
+    def load_template(json_path: str, *, copy_on_write: bool = True) -> "Script_file":
         """从JSON文件加载草稿模板
 
         Args:
             json_path (str): JSON文件路径
+            copy_on_write (bool, optional): 是否令导入的轨道及素材直接引用解析出的草稿内容, 仅在修改时复制被修改的部分. 默认为是.
+                为否时将预先复制一份完整的轨道及素材数据, 内存占用约为前者的两倍.
 
         Raises:
             `FileNotFoundError`: JSON文件不存在
         """
-        obj = Script_file(**util.provide_ctor_defaults(Script_file))
-        obj.save_path = json_path
         if not os.path.exists(json_path):
             raise FileNotFoundError("JSON文件 '%s' 不存在" % json_path)
-        with open(json_path, "r", encoding="utf-8") as f:
-            obj.content = json.load(f)
+        with open(json_path, "rb") as f:
+            content = get_json_codec().loads(f.read())
+
+        # 直接以模板内容初始化, 而不必先构造一个基于默认模板的草稿
+        obj = Script_file.__new__(Script_file)
+        obj._init_fields(0, 0, 0)
+        obj.save_path = json_path
+        obj._content = content
 
         util.assign_attr_with_json(obj, ["fps", "duration"], obj.content)
         util.assign_attr_with_json(obj, ["width", "height"], obj.content["canvas_config"])
 
-        obj.imported_materials = deepcopy(obj.content["materials"])
-        obj.imported_tracks = [import_track(track_data) for track_data in obj.content["tracks"]]
+        materials, tracks = content["materials"], content["tracks"]
+        if not copy_on_write:
+            materials, tracks = deepcopy(materials), deepcopy(tracks)
+        # 仅复制各素材列表本身, 列表中的素材在被修改时才复制
+        obj.imported_materials = {material_type: list(material_list) if isinstance(material_list, list) else material_list
+                                  for material_type, material_list in materials.items()}
+        obj.imported_tracks = [import_track(track_data) for track_data in tracks]
+        obj._build_imported_index()
 
         return obj
 
+    def _build_imported_index(self) -> None:
+        """为导入的轨道及素材建立索引, 此后对它们的修改均应通过本类的方法进行, 以保持索引同步"""
+        self.imported_tracks_by_type = {}
+        self._imported_track_names = {}
+        for track in self.imported_tracks:
+            if not isinstance(track, Editable_track):
+                continue
+            same_type = self.imported_tracks_by_type.setdefault(track.track_type, [])
+            self._imported_track_names.setdefault((track.track_type, track.name), []).append((len(same_type), track))
+            same_type.append(track)
+
+        self._imported_material_names = {}
+        for material_type, name_key in (("videos", "material_name"), ("audios", "name")):
+            name_index: Dict[str, List[int]] = {}
+            for i, mat in enumerate(self.imported_materials.get(material_type, [])):
+                name_index.setdefault(mat[name_key], []).append(i)
+            self._imported_material_names[material_type] = name_index
+
+        self._imported_text_ids = {}
+        for i, mat in enumerate(self.imported_materials.get("texts", [])):
+            self._imported_text_ids.setdefault(mat["id"], i)
+
     def add_material(self, material: Union[Video_material, Audio_material]) -> "Script_file":
-        """向草稿文件中添加一个素材"""
-        if material in self.materials:  # 素材已存在
-            return self
-        if isinstance(material, Video_material):
-            self.materials.videos.append(material)
-        elif isinstance(material, Audio_material):
-            self.materials.audios.append(material)
-        else:
+        """向草稿文件中添加一个素材, 同一文件的同名素材只会被添加一次"""
+        if not isinstance(material, (Video_material, Audio_material)):
             raise TypeError("错误的素材类型: '%s'" % type(material))
+        if not self.materials.add(material):  # 素材已存在
+            return self
+        self.material_registry[material.material_id] = (material, file_fingerprint(material.path))
         return self
 
+    @overload
+    def load_material(self, path: str, material_class: Type[Video_material] = Video_material,
+                      material_name: Optional[str] = None, **kwargs: Any) -> Video_material: ...
+    @overload
+    def load_material(self, path: str, material_class: Type[Audio_material],
+                      material_name: Optional[str] = None, **kwargs: Any) -> Audio_material: ...
+
+    def load_material(self, path, material_class=Video_material, material_name=None, **kwargs):
+        """获取草稿中指定文件对应的素材, 若尚未添加则创建素材并添加到草稿中
+
+        已添加且文件未发生变化(大小及修改时间不变)的素材将被直接返回而不会重新探测, 因此可以在循环中放心调用;
+        若文件发生了变化, 则重新探测并就地更新已有的素材
+
+        Args:
+            path (`str`): 素材文件路径
+            material_class (`Type[Video_material]` or `Type[Audio_material]`, optional): 素材类型, 默认为`Video_material`
+            material_name (`str`, optional): 素材名称, 默认使用文件名
+            **kwargs: 创建素材时传递给素材构造函数的其它参数, 如`crop_settings`及`lazy`. 返回已有素材时被忽略.
+
+        Raises:
+            `FileNotFoundError`: 素材文件不存在
+            `TypeError`: 错误的素材类型
+            `ValueError`: 不支持的素材文件类型
+        """
+        if material_class is not Video_material and material_class is not Audio_material:
+            raise TypeError("错误的素材类型: '%s'" % material_class)
+
+        path = os.path.abspath(path)
+        material_id = material_id_for(path, material_name if material_name else os.path.basename(path))
+        registered = self.material_registry.get(material_id)
+        if registered is not None and isinstance(registered[0], material_class):
+            material, fingerprint = registered
+            new_fingerprint = file_fingerprint(path)
+            if new_fingerprint != fingerprint:  # 文件已变化, 重新探测
+                material._probe()
+                self.material_registry[material_id] = (material, new_fingerprint)
+            return material
+
+        material = material_class(path, material_name, **kwargs)
+        self.add_material(material)
+        return material
+
+    @_with_script_ids
     def add_track(self, track_type: Track_type, track_name: Optional[str] = None, *,
                   relative_index: int = 0, absolute_index: Optional[int] = None) -> "Script_file":
         """向草稿文件中添加一个指定类型、指定名称的轨道, 可以自定义轨道层级
@@ -262,17 +541,20 @@ class Script_file:
         """
 
         if track_name is None:
-            if track_type in [track.track_type for track in self.tracks.values()]:
+            if self.tracks_by_type.get(track_type):
                 raise NameError("'%s' 类型的轨道已存在, 请为新轨道指定名称以避免混淆" % track_type)
             track_name = track_type.name
-        if track_name in [track.name for track in self.tracks.values()]:
+        if track_name in self.tracks:
             raise NameError("名为 '%s' 的轨道已存在" % track_name)
 
         render_index = track_type.value.render_index + relative_index
         if absolute_index is not None:
             render_index = absolute_index
 
-        self.tracks[track_name] = Track(track_type, track_name, render_index)
+        track: Track = Track(track_type, track_name, render_index)
+        self.tracks[track_name] = track
+        self.tracks_by_type.setdefault(track_type, []).append(track)
+        mark_changed()
         return self
 
     def _get_track(self, segment_type: Type[Base_segment], track_name: Optional[str]) -> Track:
@@ -282,11 +564,12 @@ class Script_file:
                 raise NameError("不存在名为 '%s' 的轨道" % track_name)
             return self.tracks[track_name]
         # 寻找唯一的同类型的轨道
-        count = sum([1 for track in self.tracks.values() if track.accept_segment_type == segment_type])
-        if count == 0: raise NameError("不存在接受 '%s' 的轨道" % segment_type)
-        if count > 1: raise NameError("存在多个接受 '%s' 的轨道, 请指定轨道名称" % segment_type)
+        track_type = _SEGMENT_TRACK_TYPES.get(segment_type)
+        candidates = self.tracks_by_type.get(track_type, []) if track_type is not None else []
+        if len(candidates) == 0: raise NameError("不存在接受 '%s' 的轨道" % segment_type)
+        if len(candidates) > 1: raise NameError("存在多个接受 '%s' 的轨道, 请指定轨道名称" % segment_type)
 
-        return next(track for track in self.tracks.values() if track.accept_segment_type == segment_type)
+        return candidates[0]
 
     def add_segment(self, segment: Union[Video_segment, Sticker_segment, Audio_segment, Text_segment],
                     track_name: Optional[str] = None) -> "Script_file":
@@ -307,42 +590,71 @@ class Script_file:
         target.add_segment(segment)
         self.duration = max(self.duration, segment.end)
 
-        # 自动添加相关素材
+        self._add_segment_materials(segment)
+        return self
+
+    def add_segments(self, segments: Iterable[Union[Video_segment, Sticker_segment, Audio_segment, Text_segment]],
+                     track_name: Optional[str] = None) -> "Script_file":
+        """向指定轨道中批量添加同一类型的片段, 效果与逐个调用`add_segment`相同
+
+        片段可以为任意顺序. 任一片段不满足要求时抛出异常, 此时轨道及素材均保持不变
+
+        Args:
+            segments (`Iterable` of `Video_segment`, `Sticker_segment`, `Audio_segment`, or `Text_segment`): 要添加的片段
+            track_name (`str`, optional): 添加到的轨道名称. 当此类型的轨道仅有一条时可省略.
+
+        Raises:
+            `NameError`: 未找到指定名称的轨道, 或必须提供`track_name`参数时未提供
+            `TypeError`: 片段类型不匹配轨道类型
+            `SegmentOverlap`: 新片段之间或新片段与已有片段重叠
+        """
+        segments = list(segments)
+        if len(segments) == 0:
+            return self
+        target = self._get_track(type(segments[0]), track_name)
+
+        # 加入轨道并更新时长
+        target.extend(segments)
+        self.duration = max(self.duration, max(segment.end for segment in segments))
+
+        for segment in segments:
+            self._add_segment_materials(segment)
+        return self
+
+    def _add_segment_materials(self, segment: Union[Video_segment, Sticker_segment, Audio_segment, Text_segment]) -> None:
+        """自动添加片段的相关素材, 并检查片段素材是否已添加"""
         if isinstance(segment, Video_segment):
             # 出入场等动画
-            if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
-                self.materials.animations.append(segment.animations_instance)
+            if segment.animations_instance is not None:
+                self.materials.add(segment.animations_instance)
             # 特效
             for effect in segment.effects:
-                if effect not in self.materials:
-                    self.materials.video_effects.append(effect)
+                self.materials.add(effect)
             # 滤镜
             for filter_ in segment.filters:
-                if filter_ not in self.materials:
-                    self.materials.filters.append(filter_)
+                self.materials.add(filter_)
             # 蒙版
             if segment.mask is not None:
                 self.materials.masks.append(segment.mask.export_json())
             # 转场
-            if (segment.transition is not None) and (segment.transition not in self.materials):
-                self.materials.transitions.append(segment.transition)
+            if segment.transition is not None:
+                self.materials.add(segment.transition)
 
             self.materials.speeds.append(segment.speed)
         elif isinstance(segment, Sticker_segment):
             self.materials.stickers.append(segment.export_material())
         elif isinstance(segment, Audio_segment):
             # 淡入淡出
-            if (segment.fade is not None) and (segment.fade not in self.materials):
-                self.materials.audio_fades.append(segment.fade)
+            if segment.fade is not None:
+                self.materials.add(segment.fade)
             # 特效
             for effect in segment.effects:
-                if effect not in self.materials:
-                    self.materials.audio_effects.append(effect)
+                self.materials.add(effect)
             self.materials.speeds.append(segment.speed)
         elif isinstance(segment, Text_segment):
             # 出入场等动画
-            if (segment.animations_instance is not None) and (segment.animations_instance not in self.materials):
-                self.materials.animations.append(segment.animations_instance)
+            if segment.animations_instance is not None:
+                self.materials.add(segment.animations_instance)
             # 字幕样式
             self.materials.texts.append(segment.export_material())
 
@@ -350,8 +662,7 @@ class Script_file:
         if not self.materials.contains_material(segment):
             warnings.warn("片段 '%s' 的素材尚未被添加至草稿中" % str(segment.target_timerange))
 
-        return self
-
+    @_with_script_ids
     def add_effect(self, effect: Union[Video_scene_effect_type, Video_character_effect_type],
                    t_range: Timerange, track_name: Optional[str] = None, *,
                    params: Optional[List[Optional[float]]] = None) -> "Script_file":
@@ -377,10 +688,10 @@ class Script_file:
         self.duration = max(self.duration, t_range.start + t_range.duration)
 
         # 自动添加相关素材
-        if segment.effect_inst not in self.materials:
-            self.materials.video_effects.append(segment.effect_inst)
+        self.materials.add(segment.effect_inst)
         return self
 
+    @_with_script_ids
     def add_filter(self, filter_meta: Filter_type, t_range: Timerange,
                    track_name: Optional[str] = None, intensity: float = 100.0) -> "Script_file":
         """向指定的滤镜轨道中添加一个滤镜片段
@@ -404,13 +715,14 @@ class Script_file:
         self.duration = max(self.duration, t_range.end)
 
         # 自动添加相关素材
-        self.materials.filters.append(segment.material)
+        self.materials.add(segment.material)
         return self
 
     def import_srt(self, srt_path: str, track_name: str, *,
                    time_offset: Union[str, float] = 0.0,
                    text_style: Text_style = Text_style(size=5, align=1),
-                   clip_settings: Clip_settings = Clip_settings(transform_y=-0.8)) -> "Script_file":
+                   clip_settings: Clip_settings = Clip_settings(transform_y=-0.8),
+                   errors: Optional[List[Subtitle_error]] = None) -> "Script_file":
         """从SRT文件中导入字幕
 
         Args:
@@ -419,58 +731,56 @@ class Script_file:
             time_offset (`Union[str, float]`, optional): 字幕整体时间偏移, 单位为微秒, 默认为0.
             text_style (`Text_style`, optional): 字幕样式, 默认模仿剪映导入字幕时的样式.
             clip_settings (`Clip_settings`, optional): 图像调节设置, 默认模仿剪映导入字幕时的设置.
+            errors (`List[Subtitle_error]`, optional): 用于记录格式错误的字幕块的列表, 默认以警告的形式输出.
 
         Raises:
             `NameError`: 已存在同名轨道
             `TypeError`: 轨道类型不匹配
         """
+        return self.import_subtitles(srt_path, track_name, subtitle_format="srt", time_offset=time_offset,
+                                     text_style=text_style, clip_settings=clip_settings, errors=errors)
+
+    @_with_script_ids
+    def import_subtitles(self, file_path: str, track_name: str, *,
+                         subtitle_format: Optional[str] = None,
+                         time_offset: Union[str, float] = 0.0,
+                         text_style: Text_style = Text_style(size=5, align=1),
+                         clip_settings: Clip_settings = Clip_settings(transform_y=-0.8),
+                         errors: Optional[List[Subtitle_error]] = None) -> "Script_file":
+        """从SRT, WebVTT或ASS文件中导入字幕
+
+        字幕文件被逐行解析, 所有字幕片段最后一次性加入轨道. 格式错误的字幕块会被跳过, 而不会中断导入
+
+        Args:
+            file_path (`str`): 字幕文件路径
+            track_name (`str`): 导入到的文本轨道名称, 若不存在则自动创建
+            subtitle_format (`str`, optional): 字幕格式, 可以为"srt", "vtt", "ass"或"ssa". 默认根据文件扩展名判断.
+            time_offset (`Union[str, float]`, optional): 字幕整体时间偏移, 单位为微秒, 默认为0.
+            text_style (`Text_style`, optional): 字幕样式, 默认模仿剪映导入字幕时的样式.
+            clip_settings (`Clip_settings`, optional): 图像调节设置, 默认模仿剪映导入字幕时的设置.
+            errors (`List[Subtitle_error]`, optional): 用于记录格式错误的字幕块的列表, 默认以警告的形式输出.
+
+        Raises:
+            `ValueError`: 不支持的字幕格式
+            `NameError`: 已存在同名轨道
+            `TypeError`: 轨道类型不匹配
+            `SegmentOverlap`: 字幕之间或字幕与轨道上已有的片段重叠
+        """
         time_offset = tim(time_offset)
-        if track_name not in self.tracks:
-            self.add_track(Track_type.text, track_name, relative_index=999)  # 在所有文本轨道的最上层
+        cue_errors: List[Subtitle_error] = [] if errors is None else errors
+        error_count = len(cue_errors)
+        segments = [Text_segment(cue.text, Timerange(cue.start + time_offset, cue.end - cue.start),
+                                 style=text_style, clip_settings=clip_settings)
+                    for cue in read_subtitles(file_path, subtitle_format, cue_errors)]
 
-        with open(srt_path, "r", encoding="utf-8") as srt_file:
-            lines = srt_file.readlines()
-
-        index = 0
-        text: str = ""
-        text_trange: Timerange
-        read_state: Literal["index", "timestamp", "content"] = "index"
-        while index < len(lines):
-            line = lines[index].strip()
-            if read_state == "index":
-                if len(line) == 0:
-                    index += 1
-                    continue
-                if not line.isdigit():
-                    raise ValueError("Expected a number at line %d, got '%s'" % (index+1, line))
-                index += 1
-                read_state = "timestamp"
-            elif read_state == "timestamp":
-                # 读取时间戳
-                start_str, end_str = line.split(" --> ")
-                start, end = srt_tstamp(start_str), srt_tstamp(end_str)
-                text_trange = Timerange(start + time_offset, end - start)
-
-                index += 1
-                read_state = "content"
-            elif read_state == "content":
-                # 内容结束, 生成片段
-                if len(line) == 0:
-                    seg = Text_segment(text, text_trange, style=text_style, clip_settings=clip_settings)
-                    self.add_segment(seg, track_name)
-
-                    text = ""
-                    read_state = "index"
-                else:
-                    text += line + "\n"
-                index += 1
-
-        # 添加最后一个片段
-        if len(text) > 0:
-            seg = Text_segment(text, text_trange, style=text_style, clip_settings=clip_settings)
-            self.add_segment(seg, track_name)
+        if errors is None and len(cue_errors) > error_count:
+            shown = "\n".join(str(error) for error in cue_errors[:10])
+            warnings.warn("字幕文件 '%s' 中有%d处格式错误, 相应字幕已被跳过:\n%s%s" %
+                          (file_path, len(cue_errors), shown, "\n..." if len(cue_errors) > 10 else ""))
 
-        return self
+        if track_name not in self.tracks:
+            self.add_track(Track_type.text, track_name, relative_index=999)  # 在所有文本轨道的最上层
+        return self.add_segments(segments, track_name)
 
     def get_imported_track(self, track_type: Literal[Track_type.video, Track_type.audio, Track_type.text],
                            name: Optional[str] = None, index: Optional[int] = None) -> Editable_track:
@@ -487,17 +797,13 @@ class Script_file:
             `TrackNotFound`: 未找到满足条件的轨道
             `AmbiguousTrack`: 找到多个满足条件的轨道
         """
-        tracks_of_same_type: List[Editable_track] = []
-        for track in self.imported_tracks:
-            if track.track_type == track_type:
-                assert isinstance(track, Editable_track)
-                tracks_of_same_type.append(track)
+        candidates: List[Tuple[int, Editable_track]]
+        if name is not None:
+            candidates = self._imported_track_names.get((track_type, name), [])
+        else:
+            candidates = list(enumerate(self.imported_tracks_by_type.get(track_type, [])))
 
-        ret: List[Editable_track] = []
-        for ind, track in enumerate(tracks_of_same_type):
-            if (name is not None) and (track.name != name): continue
-            if (index is not None) and (ind != index): continue
-            ret.append(track)
+        ret: List[Editable_track] = [track for ind, track in candidates if (index is None) or (ind == index)]
 
         if len(ret) == 0:
             raise exceptions.TrackNotFound(
@@ -525,19 +831,21 @@ class Script_file:
         """
         video_mode = isinstance(material, Video_material)
         # 查找素材
-        target_json_obj: Optional[Dict[str, Any]] = None
-        target_material_list = self.imported_materials["videos" if video_mode else "audios"]
+        material_type = "videos" if video_mode else "audios"
         name_key = "material_name" if video_mode else "name"
-        for mat in target_material_list:
-            if mat[name_key] == material_name:
-                if target_json_obj is not None:
-                    raise exceptions.AmbiguousMaterial(
-                        "找到多个名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
-                target_json_obj = mat
-        if target_json_obj is None:
+        name_index = self._imported_material_names.get(material_type, {})
+        target_indices = name_index.get(material_name, [])
+        if len(target_indices) > 1:
+            raise exceptions.AmbiguousMaterial("找到多个名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
+        if len(target_indices) == 0:
             raise exceptions.MaterialNotFound("没有找到名为 '%s', 类型为 '%s' 的素材" % (material_name, type(material)))
+        target_index = target_indices[0]
 
-        # 更新素材信息
+        # 更新素材信息及名称索引
+        target_json_obj = self._copy_imported_material(material_type, target_index)
+        if material.material_name != material_name:
+            del name_index[material_name]
+            name_index.setdefault(material.material_name, []).append(target_index)
         target_json_obj.update({name_key: material.material_name, "path": material.path, "duration": material.duration})
         if video_mode:
             target_json_obj.update({"width": material.width, "height": material.height, "material_type": material.material_type})
@@ -568,30 +876,84 @@ class Script_file:
         """
         if not isinstance(track, Imported_media_track):
             raise TypeError("指定的轨道(类型为 %s)不支持素材替换" % track.track_type)
-        if not 0 <= segment_index < len(track):
-            raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
-        if not track.check_material_type(material):
-            raise TypeError("指定的素材类型 %s 不匹配轨道类型 %s", (type(material), track.track_type))
-        seg = track.segments[segment_index]
-
+        source_timerange = self._prepare_replacement(track, segment_index, material, source_timerange)
         if isinstance(handle_extend, Extend_mode):
             handle_extend = [handle_extend]
-        if source_timerange is None:
-            if isinstance(material, Video_material) and (material.material_type == "photo"):
-                source_timerange = Timerange(0, seg.duration)
-            else:
-                source_timerange = Timerange(0, material.duration)
 
         # 处理时间变化
         track.process_timerange(segment_index, source_timerange, handle_shrink, handle_extend)
 
         # 最后替换素材链接
-        track.segments[segment_index].material_id = material.material_id
+        segment = track.get_segment(segment_index)
+        segment.material_id = material.material_id
+        segment.touch()
         self.add_material(material)
 
         # TODO: 更新总长
         return self
 
+    def replace_many(self, track: Editable_track,
+                     replacements: Dict[int, Union[Video_material, Audio_material,
+                                                   Tuple[Union[Video_material, Audio_material], Optional[Timerange]]]], *,
+                     handle_shrink: Shrink_mode = Shrink_mode.cut_tail,
+                     handle_extend: Union[Extend_mode, List[Extend_mode]] = Extend_mode.cut_material_tail) -> "Script_file":
+        """批量替换指定音视频轨道上多个片段的素材, 结果与按片段下标升序逐个调用`replace_material_by_seg`相同,
+        但后续片段的平移(`Shrink_mode.cut_tail_align`及`Extend_mode.push_tail`)在整个轨道上只进行一次
+
+        Args:
+            track (`Editable_track`): 要替换素材的轨道, 由`get_imported_track`获取
+            replacements (`Dict[int, ...]`): 以片段下标为键的新素材, 也可以是(新素材, 截取的素材时间范围)元组, 含义同`replace_material_by_seg`
+            handle_shrink (`Shrink_mode`, optional): 新素材比原素材短时的处理方式, 默认为裁剪尾部, 使片段长度与素材一致.
+            handle_extend (`Extend_mode` or `List[Extend_mode]`, optional): 新素材比原素材长时的处理方式, 将按顺序逐个尝试直至成功或抛出异常.
+                默认为截断素材尾部, 使片段维持原长不变
+
+        Raises:
+            `IndexError`: 片段下标越界
+            `TypeError`: 轨道或素材类型不正确
+            `ExtensionFailed`: 新素材比原素材长时处理失败, 此时位于其前的片段已完成替换
+        """
+        if not isinstance(track, Imported_media_track):
+            raise TypeError("指定的轨道(类型为 %s)不支持素材替换" % track.track_type)
+        if isinstance(handle_extend, Extend_mode):
+            handle_extend = [handle_extend]
+
+        # 先检查所有替换项, 再统一处理时间变化
+        materials: Dict[int, Union[Video_material, Audio_material]] = {}
+        timeranges: Dict[int, Timerange] = {}
+        for segment_index in sorted(replacements):
+            replacement = replacements[segment_index]
+            material, source_timerange = replacement if isinstance(replacement, tuple) else (replacement, None)
+            timeranges[segment_index] = self._prepare_replacement(track, segment_index, material, source_timerange)
+            materials[segment_index] = material
+
+        try:
+            track.process_timeranges(timeranges, handle_shrink, handle_extend)
+        finally:
+            # 替换已成功处理的片段的素材链接
+            for segment_index, material in materials.items():
+                if track.get_segment(segment_index).source_timerange is not timeranges[segment_index]:
+                    break
+                segment = track.get_segment(segment_index)
+                segment.material_id = material.material_id
+                segment.touch()
+                self.add_material(material)
+
+        return self
+
+    def _prepare_replacement(self, track: Imported_media_track, segment_index: int, material: Union[Video_material, Audio_material],
+                             source_timerange: Optional[Timerange]) -> Timerange:
+        """检查素材替换的参数, 并返回实际截取的素材时间范围"""
+        if not 0 <= segment_index < len(track):
+            raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
+        if not track.check_material_type(material):
+            raise TypeError("指定的素材类型 %s 不匹配轨道类型 %s", (type(material), track.track_type))
+
+        if source_timerange is not None:
+            return source_timerange
+        if isinstance(material, Video_material) and (material.material_type == "photo"):
+            return Timerange(0, track.get_segment(segment_index).duration)
+        return Timerange(0, material.duration)
+
     def replace_text(self, track: Editable_track, segment_index: int, text: str) -> "Script_file":
         """替换指定文本轨道上指定片段的文字内容
 
@@ -604,22 +966,48 @@ class Script_file:
             `IndexError`: `segment_index`越界
             `TypeError`: 轨道类型不正确
         """
+        return self.replace_texts(track, {segment_index: text})
+
+    def replace_texts(self, track: Editable_track, texts: Dict[int, str]) -> "Script_file":
+        """批量替换指定文本轨道上多个片段的文字内容, 每个文本素材的内容只被解析及重新编码一次
+
+        Args:
+            track (`Editable_track`): 要替换文字的文本轨道, 由`get_imported_track`获取
+            texts (`Dict[int, str]`): 以片段下标为键的新文字内容
+
+        Raises:
+            `IndexError`: 片段下标越界
+            `TypeError`: 轨道类型不正确
+        """
         if not isinstance(track, Imported_text_track):
             raise TypeError("指定的轨道(类型为 %s)不支持文本内容替换" % track.track_type)
-        if not 0 <= segment_index < len(track):
-            raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
 
-        material_id: str = track.segments[segment_index]["material_id"]
-        for mat in self.imported_materials["texts"]:
-            if mat["id"] != material_id: continue
-
-            content = json.loads(mat["content"])
+        # 按文本素材归并, 多个片段引用同一素材时以下标最大者为准
+        material_texts: Dict[int, str] = {}
+        for segment_index in sorted(texts):
+            if not 0 <= segment_index < len(track):
+                raise IndexError("片段下标 %d 超出 [0, %d) 的范围" % (segment_index, len(track)))
+            material_index = self._imported_text_ids.get(track.segments[segment_index]["material_id"])
+            if material_index is not None:
+                material_texts[material_index] = texts[segment_index]
+
+        for material_index, text in material_texts.items():
+            content = json.loads(self.imported_materials["texts"][material_index]["content"])
             content["text"] = text
-            mat["content"] = json.dumps(content, ensure_ascii=False)
-            break
+            self._copy_imported_material("texts", material_index)["content"] = json.dumps(content, ensure_ascii=False)
 
         return self
 
+    def _copy_imported_material(self, material_type: str, index: int) -> Dict[str, Any]:
+        """将指定的导入素材替换为其浅拷贝并返回, 以免修改与草稿内容共享的原始数据
+
+        返回的字典可直接修改其顶层字段, 但不应原地修改其中嵌套的字典或列表
+        """
+        material_list = self.imported_materials[material_type]
+        material_list[index] = dict(material_list[index])
+        mark_changed()
+        return material_list[index]
+
     def inspect_material(self) -> None:
         """输出草稿中导入的贴纸素材的元数据"""
         print("贴纸素材:")
@@ -627,38 +1015,96 @@ class Script_file:
             print("\tResource id: %s '%s'" % (sticker["resource_id"], sticker.get("name", "")))
 
     def dumps(self) -> str:
-        """将草稿文件内容导出为JSON字符串"""
-        self.content["fps"] = self.fps
-        self.content["duration"] = self.duration
-        self.content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
-        self.content["materials"] = self.materials.export_json()
+        """将草稿文件内容导出为JSON字符串, 不会修改草稿对象本身, 故可被重复调用"""
+        buffer = io.StringIO()
+        dump_stream(self._export_content_lazy(), buffer, indent=4)
+        return buffer.getvalue()
+
+    def _export_content_lazy(self) -> Dict[str, Any]:
+        """构造与`dumps`导出内容相同的字典, 但素材及轨道列表以生成器的形式给出, 且不修改`self.content`"""
+        # 尚未复制默认模板时直接读取共享的模板, 此处只会替换其顶层的键
+        content = dict(self._content if self._content is not None else _load_base_template(self.TEMPLATE_FILE))
+        content["fps"] = self.fps
+        content["duration"] = self.duration
+        content["canvas_config"] = {"width": self.width, "height": self.height, "ratio": "original"}
 
         # 合并导入的素材
+        materials = self.materials.export_json_lazy()
         for material_type, material_list in self.imported_materials.items():
-            if material_type not in self.content["materials"]:
-                self.content["materials"][material_type] = material_list
+            if material_type not in materials:
+                materials[material_type] = iter(material_list)
             else:
-                self.content["materials"][material_type].extend(material_list)
+                materials[material_type] = itertools.chain(materials[material_type], material_list)
+        content["materials"] = materials
 
         # 对轨道排序并导出
         track_list: List[Base_track] = list(self.tracks.values())
         track_list.extend(self.imported_tracks)
         track_list.sort(key=lambda track: track.render_index)
-        self.content["tracks"] = [track.export_json() for track in track_list]
+        content["tracks"] = (track.export_json_lazy() for track in track_list)
 
-        return json.dumps(self.content, ensure_ascii=False, indent=4)
+        return content
 
-    def dump(self, file_path: str) -> None:
-        """将草稿文件内容写入文件"""
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(self.dumps())
+    def dump(self, file_path: str, *, indent: Optional[int] = 4, skip_unchanged: bool = False) -> bool:
+        """将草稿文件内容流式写入文件, 不会在内存中构造完整的JSON字符串
 
-    def save(self) -> None:
+        写入总是原子性的: 内容先被写入同目录下的临时文件并同步至磁盘, 再替换目标文件, 故写入中途出错不会损坏原文件
+
+        Args:
+            file_path (`str`): 写入的文件路径
+            indent (`int`, optional): 缩进空格数, 默认为4, 此时输出与`dumps`完全一致. 为None时输出紧凑格式.
+                所用的JSON编解码后端可通过`set_json_codec`设置.
+            skip_unchanged (`bool`, optional): 若该文件自上次写入后未被改动, 且草稿自那时起未被修改, 则跳过写入. 默认为False.
+                草稿是否被修改依据导出内容判断, 内容未变时跳过对原文件的替换.
+                若已通过`set_export_cache`启用导出缓存, 则依据全局修改版本号判断, 未修改时无需重新导出;
+                此时通过本库的方法所做的修改均会被检测到, 直接为对象属性赋值后则需调用其`touch`方法.
+
+        Returns:
+            `bool`: 是否实际进行了写入
+        """
+        file_path = os.path.abspath(file_path)
+        state = (global_revision(), indent, get_json_codec(), self.width, self.height, self.fps, self.duration)
+        last = self._last_write
+        if not skip_unchanged or last is None or last[0] != file_path or _file_signature(file_path) != last[3]:
+            last = None
+        elif last[1] == state and export_cache_enabled():
+            return False
+
+        tmp_path = "%s.%s.tmp" % (file_path, uuid.uuid4().hex[:8])
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                hasher = _Hashing_writer(f)
+                dump_stream(self._export_content_lazy(), hasher, indent=indent)
+                unchanged = last is not None and hasher.hexdigest() == last[2]
+                if not unchanged:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if unchanged:  # 内容与原文件相同, 保留原文件
+                os.remove(tmp_path)
+                self._last_write = (file_path, state, last[2], last[3])
+                return False
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        _fsync_dir(os.path.dirname(file_path))
+
+        self._last_write = (file_path, state, hasher.hexdigest(), _file_signature(file_path))
+        return True
+
+    def save(self, *, skip_unchanged: bool = False) -> bool:
         """保存草稿文件至打开时的路径, 仅在模板模式下可用
 
+        Args:
+            skip_unchanged (`bool`, optional): 若草稿内容自上次保存以来未发生变化, 且文件未被改动, 则跳过写入. 默认为False.
+
+        Returns:
+            `bool`: 是否实际进行了写入
+
         Raises:
             `ValueError`: 不在模板模式下
         """
         if self.save_path is None:
             raise ValueError("没有设置保存路径, 可能不在模板模式下")
-        self.dump(self.save_path)
+        return self.dump(self.save_path, skip_unchanged=skip_unchanged)
@@ -1,15 +1,17 @@
 """定义片段基类及部分比较通用的属性类"""
 
-import uuid
-
 from typing import Optional, Dict, List, Any
 
+from .export_cache import Exportable
+from .id_provider import new_id
 from .time_util import Timerange
-from .keyframe import Keyframe_list
+from .keyframe import Keyframe_property, Keyframe_list
 
-class Base_segment:
+class Base_segment(Exportable):
     """片段基类"""
 
+    __slots__ = ("segment_id", "material_id", "target_timerange", "common_keyframes")
+
     segment_id: str
     """片段全局id, 由程序自动生成"""
     material_id: str
@@ -17,15 +19,15 @@ class Base_segment:
     target_timerange: Timerange
     """片段在轨道上的时间范围"""
 
-    common_keyframes: List[Keyframe_list]
-    """各属性的关键帧列表"""
+    common_keyframes: Dict[Keyframe_property, Keyframe_list]
+    """各属性的关键帧列表, 以关键帧属性为键, 按创建顺序排列"""
 
     def __init__(self, material_id: str, target_timerange: Timerange):
-        self.segment_id = uuid.uuid4().hex
+        self.segment_id = new_id()
         self.material_id = material_id
         self.target_timerange = target_timerange
 
-        self.common_keyframes = []
+        self.common_keyframes = {}
 
     @property
     def start(self) -> int:
@@ -52,40 +54,62 @@ class Base_segment:
         """判断是否与另一个片段有重叠"""
         return self.target_timerange.overlaps(other.target_timerange)
 
+    def _keyframe_list(self, _property: Keyframe_property) -> Keyframe_list:
+        """获取给定属性的关键帧列表, 不存在时创建之"""
+        kf_list = self.common_keyframes.get(_property)
+        if kf_list is None:
+            kf_list = Keyframe_list(_property)
+            self.common_keyframes[_property] = kf_list
+            self.touch()
+        return kf_list
+
+    _EXPORT_SKELETON: Dict[str, Any] = {
+        "enable_adjust": True,
+        "enable_color_correct_adjust": False,
+        "enable_color_curves": True,
+        "enable_color_match_adjust": False,
+        "enable_color_wheels": True,
+        "enable_lut": True,
+        "enable_smart_color_adjust": False,
+        "last_nonzero_volume": 1.0,
+        "reverse": False,
+        "track_attribute": 0,
+        "track_render_index": 0,
+        "visible": True,
+        # 写入自定义字段
+        "id": None,
+        "material_id": None,
+        "target_timerange": None,
+
+        "common_keyframes": None,
+        "keyframe_refs": None,
+    }
+    """导出结果中的常量部分, 各变量字段及嵌套的列表仅占位以保持键的顺序, 每次导出时重新生成"""
+
     def export_json(self) -> Dict[str, Any]:
         """返回通用于各种片段的属性"""
-        return {
-            "enable_adjust": True,
-            "enable_color_correct_adjust": False,
-            "enable_color_curves": True,
-            "enable_color_match_adjust": False,
-            "enable_color_wheels": True,
-            "enable_lut": True,
-            "enable_smart_color_adjust": False,
-            "last_nonzero_volume": 1.0,
-            "reverse": False,
-            "track_attribute": 0,
-            "track_render_index": 0,
-            "visible": True,
-            # 写入自定义字段
+        ret = dict(self._EXPORT_SKELETON)
+        ret.update({
             "id": self.segment_id,
             "material_id": self.material_id,
             "target_timerange": self.target_timerange.export_json(),
-
-            "common_keyframes": [kf_list.export_json() for kf_list in self.common_keyframes],
+            "common_keyframes": [kf_list.export_json() for kf_list in self.common_keyframes.values()],
             "keyframe_refs": [],  # 意义不明
-        }
+        })
+        return ret
 
-class Speed:
+class Speed(Exportable):
     """播放速度对象, 目前只支持固定速度"""
 
+    __slots__ = ("global_id", "speed")
+
     global_id: str
     """全局id, 由程序自动生成"""
     speed: float
     """播放速度"""
 
     def __init__(self, speed: float):
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.speed = speed
 
     def export_json(self) -> Dict[str, Any]:
@@ -97,9 +121,12 @@ class Speed:
             "type": "speed"
         }
 
-class Clip_settings:
+class Clip_settings(Exportable):
     """素材片段的图像调节设置"""
 
+    __slots__ = ("alpha", "flip_horizontal", "flip_vertical", "rotation", "scale_x", "scale_y",
+                 "transform_x", "transform_y")
+
     alpha: float
     """图像不透明度, 0-1"""
     flip_horizontal: bool
@@ -154,6 +181,8 @@ class Clip_settings:
 class Media_segment(Base_segment):
     """媒体片段基类"""
 
+    __slots__ = ("source_timerange", "speed", "volume", "extra_material_refs")
+
     source_timerange: Optional[Timerange]
     """截取的素材片段的时间范围, 对贴纸而言不存在"""
     speed: Speed
@@ -0,0 +1,246 @@
+"""字幕文件(SRT, WebVTT及ASS)的流式解析
+
+各解析函数逐行读取输入并以生成器的形式逐条给出字幕, 仅在内存中保留当前字幕块.
+格式错误的字幕块会被跳过, 并连同其行号记录在`errors`列表中, 而不会中断整个文件的解析
+"""
+
+import os
+import re
+
+from typing import Optional, Literal, Callable, Dict, List, Tuple, Iterable, Iterator
+
+from .time_util import SEC
+
+class Subtitle_cue:
+    """一条字幕"""
+
+    start: int
+    """开始时间, 单位为微秒"""
+    end: int
+    """结束时间, 单位为微秒"""
+    text: str
+    """字幕文本, 每行均以换行符结尾"""
+    line: int
+    """字幕块在文件中的起始行号, 从1开始"""
+
+    def __init__(self, start: int, end: int, text: str, line: int):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.line = line
+
+    def __repr__(self) -> str:
+        return "Subtitle_cue(start=%d, end=%d, text=%r, line=%d)" % (self.start, self.end, self.text, self.line)
+
+class Subtitle_error:
+    """一处字幕解析错误"""
+
+    line: int
+    """出错的行号, 从1开始"""
+    message: str
+    """错误信息"""
+
+    def __init__(self, line: int, message: str):
+        self.line = line
+        self.message = message
+
+    def __str__(self) -> str:
+        return "line %d: %s" % (self.line, self.message)
+
+    def __repr__(self) -> str:
+        return "Subtitle_error(line=%d, message=%r)" % (self.line, self.message)
+
+_SRT_TIMESTAMP = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})$")
+_VTT_TIMESTAMP = re.compile(r"(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})$")
+_ASS_TIMESTAMP = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})\.(\d{1,2})$")
+_VTT_TAG = re.compile(r"<[^>]*>")
+_ASS_OVERRIDE = re.compile(r"\{[^}]*\}")
+
+def _parse_timestamp(pattern: "re.Pattern[str]", tstamp: str, fraction_unit: int) -> int:
+    """按给定格式解析时间戳, 返回微秒数, 格式不符时抛出`ValueError`"""
+    match = pattern.match(tstamp.strip())
+    if match is None:
+        raise ValueError("无法解析时间戳 '%s'" % tstamp.strip())
+    hours, minutes, seconds, fraction = match.groups()
+    return (int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds)) * SEC + int(fraction) * fraction_unit
+
+def _parse_timing(line: str, pattern: "re.Pattern[str]", fraction_unit: int) -> Tuple[int, int]:
+    """解析`开始 --> 结束`形式的时间行, WebVTT中结束时间后的字幕设置将被忽略"""
+    if "-->" not in line:
+        raise ValueError("应为时间行, 实际为 '%s'" % line)
+    start_str, end_str = line.split("-->", 1)
+    end_str = end_str.split(None, 1)[0] if len(end_str.strip()) > 0 else end_str
+    start, end = _parse_timestamp(pattern, start_str, fraction_unit), _parse_timestamp(pattern, end_str, fraction_unit)
+    if end < start:
+        raise ValueError("结束时间早于开始时间")
+    return start, end
+
+def iter_srt(lines: Iterable[str], errors: Optional[List[Subtitle_error]] = None) -> Iterator[Subtitle_cue]:
+    """逐条解析SRT字幕
+
+    Args:
+        lines (`Iterable[str]`): 字幕文件的各行, 如以文本模式打开的文件对象
+        errors (`List[Subtitle_error]`, optional): 用于记录解析错误的列表, 为None时遇到错误直接抛出`ValueError`
+    """
+    read_state: Literal["index", "timestamp", "content", "skip"] = "index"
+    text = ""
+    start = end = block_line = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        try:
+            if read_state == "skip":  # 跳过出错的字幕块的剩余部分
+                if len(line) == 0:
+                    read_state = "index"
+            elif read_state == "index":
+                if len(line) == 0:
+                    continue
+                block_line = line_no
+                if not line.isdigit():
+                    raise ValueError("应为字幕序号, 实际为 '%s'" % line)
+                read_state = "timestamp"
+            elif read_state == "timestamp":
+                start, end = _parse_timing(line, _SRT_TIMESTAMP, 1000)
+                read_state = "content"
+            elif read_state == "content":
+                # 内容结束, 给出字幕
+                if len(line) == 0:
+                    yield Subtitle_cue(start, end, text, block_line)
+                    text = ""
+                    read_state = "index"
+                else:
+                    text += line + "\n"
+        except ValueError as err:
+            if errors is None:
+                raise ValueError("line %d: %s" % (line_no, err)) from err
+            errors.append(Subtitle_error(line_no, str(err)))
+            read_state = "skip" if len(line) > 0 else "index"
+
+    # 最后一条字幕
+    if read_state == "content" and len(text) > 0:
+        yield Subtitle_cue(start, end, text, block_line)
+
+def iter_vtt(lines: Iterable[str], errors: Optional[List[Subtitle_error]] = None) -> Iterator[Subtitle_cue]:
+    """逐条解析WebVTT字幕, 字幕文本中的标签(如`<b>`)将被去除, 注释及样式块将被跳过
+
+    Args:
+        lines (`Iterable[str]`): 字幕文件的各行, 如以文本模式打开的文件对象
+        errors (`List[Subtitle_error]`, optional): 用于记录解析错误的列表, 为None时遇到错误直接抛出`ValueError`
+    """
+    read_state: Literal["header", "block", "timestamp", "content", "skip"] = "header"
+    text = ""
+    start = end = block_line = 0
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        try:
+            if read_state == "header":
+                if line_no == 1 and not line.startswith("WEBVTT"):
+                    raise ValueError("缺少WEBVTT文件头")
+                if len(line) == 0:
+                    read_state = "block"
+            elif read_state == "skip":
+                if len(line) == 0:
+                    read_state = "block"
+            elif read_state == "block":
+                if len(line) == 0:
+                    continue
+                block_line = line_no
+                if line.startswith("NOTE") or line in ("STYLE", "REGION"):
+                    read_state = "skip"
+                elif "-->" in line:
+                    start, end = _parse_timing(line, _VTT_TIMESTAMP, 1000)
+                    read_state = "content"
+                else:  # 字幕标识符, 其后应紧跟时间行
+                    read_state = "timestamp"
+            elif read_state == "timestamp":
+                start, end = _parse_timing(line, _VTT_TIMESTAMP, 1000)
+                read_state = "content"
+            elif read_state == "content":
+                if len(line) == 0:
+                    yield Subtitle_cue(start, end, text, block_line)
+                    text = ""
+                    read_state = "block"
+                else:
+                    text += _VTT_TAG.sub("", line) + "\n"
+        except ValueError as err:
+            if errors is None:
+                raise ValueError("line %d: %s" % (line_no, err)) from err
+            errors.append(Subtitle_error(line_no, str(err)))
+            read_state = "skip" if len(line) > 0 else "block"
+
+    if read_state == "content" and len(text) > 0:
+        yield Subtitle_cue(start, end, text, block_line)
+
+def iter_ass(lines: Iterable[str], errors: Optional[List[Subtitle_error]] = None) -> Iterator[Subtitle_cue]:
+    """逐条解析ASS/SSA字幕中`[Events]`部分的`Dialogue`行, 字幕文本中的样式覆盖标签(如`{\\b1}`)将被去除
+
+    Args:
+        lines (`Iterable[str]`): 字幕文件的各行, 如以文本模式打开的文件对象
+        errors (`List[Subtitle_error]`, optional): 用于记录解析错误的列表, 为None时遇到错误直接抛出`ValueError`
+    """
+    in_events = False
+    fields: List[str] = []
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if line.startswith("["):
+            in_events = line.lower() == "[events]"
+            continue
+        if not in_events:
+            continue
+
+        key, sep, value = line.partition(":")
+        if sep == "":
+            continue
+        key = key.strip().lower()
+        try:
+            if key == "format":
+                fields = [field.strip().lower() for field in value.split(",")]
+            elif key == "dialogue":
+                if not all(field in fields for field in ("start", "end", "text")):
+                    raise ValueError("Dialogue行之前缺少有效的Format行")
+                values = value.split(",", len(fields) - 1)
+                if len(values) != len(fields):
+                    raise ValueError("应有%d个字段, 实际为%d个" % (len(fields), len(values)))
+                event = dict(zip(fields, values))
+                start = _parse_timestamp(_ASS_TIMESTAMP, event["start"], SEC // 100)
+                end = _parse_timestamp(_ASS_TIMESTAMP, event["end"], SEC // 100)
+                if end < start:
+                    raise ValueError("结束时间早于开始时间")
+                text = _ASS_OVERRIDE.sub("", event["text"]).replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ")
+                if len(text.strip()) > 0:  # 跳过空白的字幕行
+                    yield Subtitle_cue(start, end, "".join(part.strip() + "\n" for part in text.split("\n")), line_no)
+        except ValueError as err:
+            if errors is None:
+                raise ValueError("line %d: %s" % (line_no, err)) from err
+            errors.append(Subtitle_error(line_no, str(err)))
+
+SUBTITLE_PARSERS: Dict[str, Callable[[Iterable[str], Optional[List[Subtitle_error]]], Iterator[Subtitle_cue]]] = {
+    "srt": iter_srt,
+    "vtt": iter_vtt,
+    "ass": iter_ass,
+    "ssa": iter_ass,
+}
+"""以格式名(即文件扩展名)为键的字幕解析函数"""
+
+def read_subtitles(file_path: str, subtitle_format: Optional[str] = None,
+                   errors: Optional[List[Subtitle_error]] = None) -> Iterator[Subtitle_cue]:
+    """逐条读取字幕文件, 文件在迭代完毕后才被关闭
+
+    Args:
+        file_path (`str`): 字幕文件路径
+        subtitle_format (`str`, optional): 字幕格式, 可以为"srt", "vtt", "ass"或"ssa". 默认根据文件扩展名判断.
+        errors (`List[Subtitle_error]`, optional): 用于记录解析错误的列表, 为None时遇到错误直接抛出`ValueError`
+
+    Raises:
+        `ValueError`: 不支持的字幕格式
+    """
+    if subtitle_format is None:
+        subtitle_format = os.path.splitext(file_path)[1][1:]
+    parser = SUBTITLE_PARSERS.get(subtitle_format.lower())
+    if parser is None:
+        raise ValueError("不支持的字幕格式: '%s'" % subtitle_format)
+    return _read_file(file_path, parser, errors)
+
+def _read_file(file_path: str, parser: Callable[[Iterable[str], Optional[List[Subtitle_error]]], Iterator[Subtitle_cue]],
+               errors: Optional[List[Subtitle_error]]) -> Iterator[Subtitle_cue]:
+    with open(file_path, "r", encoding="utf-8-sig") as subtitle_file:
+        yield from parser(subtitle_file, errors)
@@ -1,7 +1,9 @@
 """与模板模式相关的类及函数等"""
 
+import itertools
+
 from enum import Enum
-from copy import deepcopy
+from abc import abstractmethod
 
 from . import util
 from . import exceptions
@@ -10,7 +12,7 @@ from .segment import Base_segment
 from .track import Base_track, Track_type
 from .local_materials import Video_material, Audio_material
 
-from typing import List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 
 class Shrink_mode(Enum):
     """处理替换素材时素材变短情况的方法"""
@@ -43,20 +45,23 @@ class Extend_mode(Enum):
 class Imported_media_segment(Base_segment):
     """导入的视频/音频片段"""
 
+    __slots__ = ("raw_data", "source_timerange")
+
     raw_data: Dict[str, Any]
-    """原始数据"""
+    """原始数据, 与导入的草稿内容共享, 不应被修改"""
 
     source_timerange: Timerange
     """片段取用的素材时间范围"""
 
     __DATA_ATTRS = ["material_id", "source_timerange", "target_timerange"]
     def __init__(self, json_data: Dict[str, Any]):
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = json_data
 
         util.assign_attr_with_json(self, self.__DATA_ATTRS, json_data)
 
     def export_json(self) -> Dict[str, Any]:
-        json_data = deepcopy(self.raw_data)
+        # 仅替换被修改的顶层字段, 其余字段与原始数据共享
+        json_data = dict(self.raw_data)
         json_data.update(util.export_attr_to_json(self, self.__DATA_ATTRS))
         return json_data
 
@@ -64,7 +69,7 @@ class Imported_track(Base_track):
     """模板模式下导入的轨道"""
 
     raw_data: Dict[str, Any]
-    """原始轨道数据"""
+    """原始轨道数据, 与导入的草稿内容共享, 不应被修改"""
 
     def __init__(self, json_data: Dict[str, Any]):
         self.track_type = Track_type.from_name(json_data["type"])
@@ -72,57 +77,171 @@ class Imported_track(Base_track):
         self.track_id = json_data["id"]
         self.render_index = max([int(seg["render_index"]) for seg in json_data["segments"]])
 
-        self.raw_data = deepcopy(json_data)
+        self.raw_data = json_data
 
     def export_json(self) -> Dict[str, Any]:
         return self.raw_data
 
 class Editable_track(Imported_track):
-    """模板模式下导入且可修改的轨道"""
+    """模板模式下导入且可修改的轨道
 
-class Imported_text_track(Editable_track):
-    """模板模式下导入的文本轨道"""
+    轨道中的片段在首次访问`segments`时才被解析, 从未被访问过的轨道在导出时直接输出其原始数据
+    """
 
-    segments: List[Dict[str, Any]]
-    """该轨道包含的片段列表"""
+    _segments: Optional[List[Any]]
+    """已解析的片段列表, 尚未解析时为None"""
 
     def __init__(self, json_data: Dict[str, Any]):
         super().__init__(json_data)
-        self.segments = deepcopy(json_data["segments"])
+        self._segments = None
+
+    @property
+    def segments(self) -> List[Any]:
+        """该轨道包含的片段列表"""
+        return self._get_segments()
+    @segments.setter
+    def segments(self, value: List[Any]) -> None:
+        self._segments = value
+
+    def _get_segments(self) -> List[Any]:
+        """返回片段列表, 必要时先进行解析"""
+        if self._segments is None:
+            self._segments = self._parse_segments(self.raw_data["segments"])
+        return self._segments
+
+    @property
+    def parsed(self) -> bool:
+        """轨道中的片段是否已被解析"""
+        return self._segments is not None
+
+    @abstractmethod
+    def _parse_segments(self, segments_data: List[Dict[str, Any]]) -> List[Any]:
+        """由原始片段数据构造片段列表"""
 
     def __len__(self):
-        return len(self.segments)
+        if self._segments is None:
+            return len(self.raw_data["segments"])
+        return len(self._segments)
+
+class Imported_text_track(Editable_track):
+    """模板模式下导入的文本轨道"""
+
+    segments: List[Dict[str, Any]]
+    """该轨道包含的片段列表"""
+
+    def _parse_segments(self, segments_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return list(segments_data)
 
     def export_json(self) -> Dict[str, Any]:
-        self.raw_data.update({"segments": deepcopy(self.segments)})
-        return self.raw_data
+        if self._segments is None:
+            return self.raw_data
+        return dict(self.raw_data, segments=list(self._segments))
+
+    def export_json_lazy(self) -> Dict[str, Any]:
+        if self._segments is None:
+            return self.raw_data
+        return dict(self.raw_data, segments=iter(self._segments))
+
+class Ripple_offsets:
+    """记录尚未施加到片段上的平移量, 以树状数组(Fenwick树)维护其差分, 使"平移某下标之后所有片段"及查询单个片段的平移量均为O(log n)"""
+
+    size: int
+    """片段数量"""
+
+    _tree: List[int]
+    """差分数组的树状数组, 下标从1开始"""
+    _diff: List[int]
+    """差分数组本身, 用于一次性求出所有片段的平移量"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+        self._diff = [0] * size
+
+    def add_from(self, index: int, offset: int) -> None:
+        """令下标不小于`index`的所有片段的平移量增加`offset`"""
+        if index >= self.size:
+            return
+        self._diff[index] += offset
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += offset
+            i += i & (-i)
+
+    def offset_at(self, index: int) -> int:
+        """查询指定下标片段的平移量"""
+        ret = 0
+        i = index + 1
+        while i > 0:
+            ret += self._tree[i]
+            i -= i & (-i)
+        return ret
+
+    def offsets(self) -> Iterator[int]:
+        """按下标顺序给出所有片段的平移量"""
+        return itertools.accumulate(self._diff)
 
 class Imported_media_track(Editable_track):
-    """模板模式下导入的音频/视频轨道"""
+    """模板模式下导入的音频/视频轨道
 
-    segments: List[Imported_media_segment]
-    """该轨道包含的片段列表"""
+    平移后续片段的操作(`Shrink_mode.cut_tail_align`及`Extend_mode.push_tail`)仅被记录在`Ripple_offsets`中,
+    直至访问`segments`或导出时才统一施加到片段上
+    """
+
+    _offsets: Optional[Ripple_offsets]
+    """尚未施加的平移量, 没有待施加的平移时为None"""
 
     def __init__(self, json_data: Dict[str, Any]):
         super().__init__(json_data)
-        self.segments = [Imported_media_segment(seg) for seg in json_data["segments"]]
+        self._offsets = None
 
-    def __len__(self):
-        return len(self.segments)
+    def _parse_segments(self, segments_data: List[Dict[str, Any]]) -> List[Imported_media_segment]:
+        return [Imported_media_segment(seg) for seg in segments_data]
+
+    @property
+    def segments(self) -> List[Imported_media_segment]:
+        """该轨道包含的片段列表, 访问时将施加所有尚未施加的平移量"""
+        segments = self._get_segments()
+        if self._offsets is not None:
+            offsets, self._offsets = self._offsets, None
+            for seg, offset in zip(segments, offsets.offsets()):
+                if offset != 0:
+                    seg.start += offset
+        return segments
+    @segments.setter
+    def segments(self, value: List[Imported_media_segment]) -> None:
+        self._segments = value
+        self._offsets = None
+
+    def get_segment(self, seg_index: int) -> Imported_media_segment:
+        """返回指定下标的片段, 与`segments[seg_index]`相同, 但仅对该片段施加尚未施加的平移量"""
+        seg = self._get_segments()[seg_index]
+        if self._offsets is not None:
+            offset = self._offsets.offset_at(seg_index)
+            if offset != 0:
+                seg.start += offset
+                self._offsets.add_from(seg_index, -offset)
+                self._offsets.add_from(seg_index + 1, offset)
+        return seg
 
     @property
     def start_time(self) -> int:
         """轨道起始时间, 微秒"""
-        if len(self.segments) == 0:
+        if len(self) == 0:
             return 0
-        return self.segments[0].target_timerange.start
+        if self._segments is None:
+            return int(self.raw_data["segments"][0]["target_timerange"]["start"])
+        return self.get_segment(0).target_timerange.start
 
     @property
     def end_time(self) -> int:
         """轨道结束时间, 微秒"""
-        if len(self.segments) == 0:
+        if len(self) == 0:
             return 0
-        return self.segments[-1].target_timerange.end
+        if self._segments is None:
+            target_timerange = self.raw_data["segments"][-1]["target_timerange"]
+            return int(target_timerange["start"]) + int(target_timerange["duration"])
+        return self.get_segment(len(self) - 1).target_timerange.end
 
     def check_material_type(self, material: object) -> bool:
         """检查素材类型是否与轨道类型匹配"""
@@ -135,8 +254,35 @@ class Imported_media_track(Editable_track):
     def process_timerange(self, seg_index: int, src_timerange: Timerange,
                           shrink: Shrink_mode, extend: List[Extend_mode]) -> None:
         """处理素材替换的时间范围变更"""
-        seg = self.segments[seg_index]
+        ripple = self._adjust_segment(seg_index, src_timerange, shrink, extend)
+        if ripple != 0:
+            self._shift_segments(seg_index + 1, ripple)
+
+    def process_timeranges(self, replacements: Dict[int, Timerange],
+                           shrink: Shrink_mode, extend: List[Extend_mode]) -> None:
+        """批量处理多个片段素材替换的时间范围变更, 结果与按下标升序逐个调用`process_timerange`相同
+
+        后续片段的平移仅被记录下来, 每个被替换的片段只需O(log n)的额外开销
+        """
+        for seg_index in sorted(replacements):
+            self.process_timerange(seg_index, replacements[seg_index], shrink, extend)
+
+    def _shift_segments(self, start_index: int, offset: int) -> None:
+        """将下标不小于`start_index`的所有片段平移`offset`微秒, 平移量在访问`segments`时才被实际施加"""
+        if self._offsets is None:
+            self._offsets = Ripple_offsets(len(self))
+        self._offsets.add_from(start_index, offset)
+
+    def _adjust_segment(self, seg_index: int, src_timerange: Timerange,
+                        shrink: Shrink_mode, extend: List[Extend_mode]) -> int:
+        """调整单个片段的时间范围, 但不平移后续片段
+
+        Returns:
+            `int`: 后续片段应平移的量, 单位为微秒
+        """
+        seg = self.get_segment(seg_index)
         new_duration = src_timerange.duration
+        ripple = 0
 
         # 时长变短
         delta_duration = abs(new_duration - seg.duration)
@@ -147,8 +293,7 @@ class Imported_media_track(Editable_track):
                 seg.duration -= delta_duration
             elif shrink == Shrink_mode.cut_tail_align:
                 seg.duration -= delta_duration
-                for i in range(seg_index+1, len(self.segments)):  # 后续片段也依次前移相应值（保持间隙）
-                    self.segments[i].start -= delta_duration
+                ripple = -delta_duration  # 后续片段也依次前移相应值（保持间隙）
             elif shrink == Shrink_mode.shrink:
                 seg.duration -= delta_duration
                 seg.start += delta_duration // 2
@@ -157,8 +302,8 @@ class Imported_media_track(Editable_track):
         # 时长变长
         elif new_duration > seg.duration:
             success_flag = False
-            prev_seg_end = int(0) if seg_index == 0 else self.segments[seg_index-1].target_timerange.end
-            next_seg_start = int(1e15) if seg_index == len(self.segments)-1 else self.segments[seg_index+1].start
+            prev_seg_end = int(0) if seg_index == 0 else self.get_segment(seg_index-1).target_timerange.end
+            next_seg_start = int(1e15) if seg_index == len(self)-1 else self.get_segment(seg_index+1).start
             for mode in extend:
                 if mode == Extend_mode.extend_head:
                     if seg.start - delta_duration >= prev_seg_end:
@@ -171,9 +316,7 @@ class Imported_media_track(Editable_track):
                 elif mode == Extend_mode.push_tail:
                     shift_duration = max(0, seg.target_timerange.end + delta_duration - next_seg_start)
                     seg.duration += delta_duration
-                    if shift_duration > 0:  # 有必要时后移后续片段
-                        for i in range(seg_index+1, len(self.segments)):
-                            self.segments[i].start += shift_duration
+                    ripple = shift_duration  # 有必要时后移后续片段
                     success_flag = True
                 elif mode == Extend_mode.cut_material_tail:
                     src_timerange.duration = seg.duration
@@ -188,13 +331,21 @@ class Imported_media_track(Editable_track):
 
         # 写入素材时间范围
         seg.source_timerange = src_timerange
+        seg.touch()
+        return ripple
 
     def export_json(self) -> Dict[str, Any]:
-        self.raw_data.update({"segments": [seg.export_json() for seg in self.segments]})
-        return self.raw_data
+        if self._segments is None:
+            return self.raw_data
+        return dict(self.raw_data, segments=[seg.export_json() for seg in self.segments])
+
+    def export_json_lazy(self) -> Dict[str, Any]:
+        if self._segments is None:
+            return self.raw_data
+        return dict(self.raw_data, segments=(seg.export_cached() for seg in self.segments))
 
 def import_track(json_data: Dict[str, Any]) -> Imported_track:
-    """导入轨道"""
+    """导入轨道, 所导入的轨道将直接引用`json_data`中的数据而不进行复制"""
     track_type = Track_type.from_name(json_data["type"])
     if not track_type.value.allow_modify:
         return Imported_track(json_data)
@@ -1,18 +1,19 @@
 """定义文本片段及其相关类"""
 
 import json
-import uuid
 
 from typing import Dict, List, Tuple, Any
 from typing import Union, Optional, Literal
 
+from .export_cache import Exportable
+from .id_provider import new_id
 from .time_util import Timerange, tim
 from .segment import Base_segment, Clip_settings
 from .animation import Segment_animations, Text_animation
 
 from .metadata import Text_intro, Text_outro, Text_loop_anim
 
-class Text_style:
+class Text_style(Exportable):
     """字体样式类"""
 
     size: float
@@ -60,7 +61,30 @@ class Text_style:
         self.align = align
         self.vertical = vertical
 
-class Text_border:
+    def export_json(self) -> Dict[str, Any]:
+        """导出JSON数据, 放置在素材content的styles中, 不含`range`及`strokes`字段"""
+        return {
+            "fill": {
+                "alpha": 1.0,
+                "content": {
+                    "render_type": "solid",
+                    "solid": {
+                        "alpha": self.alpha,
+                        "color": list(self.color)
+                    }
+                }
+            },
+            # "font": {
+            #     "id": "",
+            #     "path": "***.ttf"
+            # },
+            "size": self.size,
+            "bold": self.bold,
+            "italic": self.italic,
+            "underline": self.underline
+        }
+
+class Text_border(Exportable):
     """文本描边的参数"""
 
     alpha: float
@@ -93,9 +117,45 @@ class Text_border:
             "width": self.width
         }
 
+_RANGE_PLACEHOLDER = 987654321
+"""生成content片段时代替文本长度的占位数字"""
+_content_fragment_cache: Dict[str, Tuple[str, str]] = {}
+"""以样式及描边参数为键缓存的content片段"""
+
+def _content_fragments(style: Text_style, border: Optional[Text_border]) -> Tuple[str, str]:
+    """返回文本素材content的JSON文本中, 位于文本长度之前及之后(至文本内容之前)的两个片段
+
+    二者只取决于样式及描边参数, 故对参数相同的片段只需编码一次
+    """
+    # 以repr为键, 以免1与1.0或True等相等但编码不同的值被视为同一参数
+    key = repr((style.alpha, style.color, style.size, style.bold, style.italic, style.underline,
+                None if border is None else (border.alpha, border.color, border.width)))
+    fragments = _content_fragment_cache.get(key)
+    if fragments is None:
+        style_json = style.export_json()
+        encoded = json.dumps({
+            "styles": [
+                {
+                    "fill": style_json.pop("fill"),
+                    "range": [0, _RANGE_PLACEHOLDER],
+                    **style_json,
+                    "strokes": [border.export_json()] if border else []
+                }
+            ],
+            "text": ""
+        })
+        head, _, tail = encoded.partition('"range": [0, %d]' % _RANGE_PLACEHOLDER)
+        fragments = (head + '"range": [0, ', "]" + tail[:-len('""}')])
+        if len(_content_fragment_cache) >= 1024:
+            _content_fragment_cache.clear()
+        _content_fragment_cache[key] = fragments
+    return fragments
+
 class Text_segment(Base_segment):
     """文本片段类, 目前仅支持设置基本的字体样式"""
 
+    __slots__ = ("text", "style", "clip_settings", "border", "animations_instance", "extra_material_refs")
+
     text: str
     """文本内容"""
     style: Text_style
@@ -115,6 +175,138 @@ class Text_segment(Base_segment):
     extra_material_refs: List[str]
     """附加的素材id列表, 用于链接动画/特效等"""
 
+    _MATERIAL_SKELETON: Dict[str, Any] = {
+        "add_type": 0,
+
+        "typesetting": None,
+        "alignment": None,
+
+        # ?
+        # "caption_template_info": {
+        #     "category_id": "",
+        #     "category_name": "",
+        #     "effect_id": "",
+        #     "is_new": False,
+        #     "path": "",
+        #     "request_id": "",
+        #     "resource_id": "",
+        #     "resource_name": "",
+        #     "source_platform": 0
+        # },
+
+        # 混合 (+4)
+        # "global_alpha": 1.0,
+
+        # 描边 (+8), 似乎也会被content覆盖
+        # "border_alpha": 1.0,
+        # "border_color": "",
+        # "border_width": 0.08,
+
+        # 背景 (+16)
+        # "background_style": 0,
+        # "background_color": "",
+        # "background_alpha": 1.0,
+        # "background_round_radius": 0.0,
+        # "background_height": 0.14,
+        # "background_width": 0.14,
+        # "background_horizontal_offset": 0.0,
+        # "background_vertical_offset": 0.0,
+
+        # 发光 (+64)，属性由extra_material_refs记录
+
+        # 阴影 (+32)
+        # "has_shadow": False,
+        # "shadow_alpha": 0.9,
+        # "shadow_angle": -45.0,
+        # "shadow_color": "",
+        # "shadow_distance": 5.0,
+        # "shadow_point": {
+        #     "x": 0.6363961030678928,
+        #     "y": -0.6363961030678928
+        # },
+        # "shadow_smoothing": 0.45,
+
+        # 整体字体设置, 似乎会被content覆盖
+        # "font_category_id": "",
+        # "font_category_name": "",
+        # "font_id": "",
+        # "font_name": "",
+        # "font_path": "",
+        # "font_resource_id": "",
+        # "font_size": 15.0,
+        # "font_source_platform": 0,
+        # "font_team_id": "",
+        # "font_title": "none",
+        # "font_url": "",
+        # "fonts": [],
+
+        # 似乎会被content覆盖
+        # "text_alpha": 1.0,
+        # "text_color": "#FFFFFF",
+        # "text_curve": None,
+        # "text_preset_resource_id": "",
+        # "text_size": 30,
+        # "underline": False,
+
+
+        "base_content": "",
+        "bold_width": 0.0,
+
+        "check_flag": None,
+        "combo_info": None,
+        "content": None,
+        "fixed_height": -1.0,
+        "fixed_width": -1.0,
+        "force_apply_line_max_width": False,
+
+        "group_id": "",
+
+        "id": None,
+        "initial_scale": 1.0,
+        "inner_padding": -1.0,
+        "is_rich_text": False,
+        "italic_degree": 0,
+        "ktv_color": "",
+        "language": "",
+        "layer_weight": 1,
+        "letter_spacing": 0.0,
+        "line_feed": 1,
+        "line_max_width": 0.82,
+        "line_spacing": 0.02,
+        "multi_language_current": "none",
+        "name": "",
+        "original_size": None,
+
+        "preset_category": "",
+        "preset_category_id": "",
+        "preset_has_set_alignment": False,
+        "preset_id": "",
+        "preset_index": 0,
+        "preset_name": "",
+
+        "recognize_task_id": "",
+        "recognize_type": 0,
+        "relevance_segment": None,
+
+        "shape_clip_x": False,
+        "shape_clip_y": False,
+        "source_from": "",
+        "style_name": "",
+        "sub_type": 0,
+        "subtitle_keywords": None,
+        "subtitle_template_original_fontsize": 0.0,
+        "text_to_audio_ids": None,
+        "tts_auto_update": False,
+        "type": "text",
+
+        "underline_offset": 0.22,
+        "underline_width": 0.05,
+
+        "use_effect_default_color": True,
+        "words": None
+    }
+    """文本素材导出结果中的常量部分, 各变量字段及嵌套的列表、字典仅占位以保持键的顺序, 每次导出时重新生成"""
+
     def __init__(self, text: str, timerange: Timerange, *,
                  style: Optional[Text_style] = None, clip_settings: Optional[Clip_settings] = None,
                  border: Optional[Text_border] = None):
@@ -129,7 +321,7 @@ class Text_segment(Base_segment):
             clip_settings (`Clip_settings`, optional): 图像调节设置, 默认不做任何变换
             border (`Text_border`, optional): 文本描边参数, 默认无描边
         """
-        super().__init__(uuid.uuid4().hex, timerange)
+        super().__init__(new_id(), timerange)
 
         self.text = text
         self.style = style or Text_style()
@@ -167,6 +359,7 @@ class Text_segment(Base_segment):
         if self.animations_instance is None:
             self.animations_instance = Segment_animations()
             self.extra_material_refs.append(self.animations_instance.animation_id)
+            self.touch()
 
         self.animations_instance.add_animation(Text_animation(animation_type, start, duration))
 
@@ -178,168 +371,21 @@ class Text_segment(Base_segment):
         check_flag: int = 7
         if self.border: check_flag |= 8
 
-        return {
-            "add_type": 0,
-
+        head, tail = _content_fragments(self.style, self.border)
+        ret = dict(self._MATERIAL_SKELETON)
+        ret.update({
             "typesetting": int(self.style.vertical),
             "alignment": self.style.align,
-
-            # ?
-            # "caption_template_info": {
-            #     "category_id": "",
-            #     "category_name": "",
-            #     "effect_id": "",
-            #     "is_new": False,
-            #     "path": "",
-            #     "request_id": "",
-            #     "resource_id": "",
-            #     "resource_name": "",
-            #     "source_platform": 0
-            # },
-
-            # 混合 (+4)
-            # "global_alpha": 1.0,
-
-            # 描边 (+8), 似乎也会被content覆盖
-            # "border_alpha": 1.0,
-            # "border_color": "",
-            # "border_width": 0.08,
-
-            # 背景 (+16)
-            # "background_style": 0,
-            # "background_color": "",
-            # "background_alpha": 1.0,
-            # "background_round_radius": 0.0,
-            # "background_height": 0.14,
-            # "background_width": 0.14,
-            # "background_horizontal_offset": 0.0,
-            # "background_vertical_offset": 0.0,
-
-            # 发光 (+64)，属性由extra_material_refs记录
-
-            # 阴影 (+32)
-            # "has_shadow": False,
-            # "shadow_alpha": 0.9,
-            # "shadow_angle": -45.0,
-            # "shadow_color": "",
-            # "shadow_distance": 5.0,
-            # "shadow_point": {
-            #     "x": 0.6363961030678928,
-            #     "y": -0.6363961030678928
-            # },
-            # "shadow_smoothing": 0.45,
-
-            # 整体字体设置, 似乎会被content覆盖
-            # "font_category_id": "",
-            # "font_category_name": "",
-            # "font_id": "",
-            # "font_name": "",
-            # "font_path": "",
-            # "font_resource_id": "",
-            # "font_size": 15.0,
-            # "font_source_platform": 0,
-            # "font_team_id": "",
-            # "font_title": "none",
-            # "font_url": "",
-            # "fonts": [],
-
-            # 似乎会被content覆盖
-            # "text_alpha": 1.0,
-            # "text_color": "#FFFFFF",
-            # "text_curve": None,
-            # "text_preset_resource_id": "",
-            # "text_size": 30,
-            # "underline": False,
-
-
-            "base_content": "",
-            "bold_width": 0.0,
-
             "check_flag": check_flag,
-            "combo_info": {
-                "text_templates": []
-            },
-            "content": json.dumps({
-                "styles": [
-                    {
-                        "fill": {
-                            "alpha": 1.0,
-                            "content": {
-                                "render_type": "solid",
-                                "solid": {
-                                    "alpha": self.style.alpha,
-                                    "color": list(self.style.color)
-                                }
-                            }
-                        },
-                        # "font": {
-                        #     "id": "",
-                        #     "path": "***.ttf"
-                        # },
-                        "range": [0, len(self.text)],
-                        "size": self.style.size,
-                        "bold": self.style.bold,
-                        "italic": self.style.italic,
-                        "underline": self.style.underline,
-                        "strokes": [self.border.export_json()] if self.border else []
-                    }
-                ],
-                "text": self.text
-            }),
-            "fixed_height": -1.0,
-            "fixed_width": -1.0,
-            "force_apply_line_max_width": False,
-
-            "group_id": "",
-
+            "combo_info": {"text_templates": []},
+            "content": "%s%d%s%s}" % (head, len(self.text), tail, json.dumps(self.text)),
             "id": self.material_id,
-            "initial_scale": 1.0,
-            "inner_padding": -1.0,
-            "is_rich_text": False,
-            "italic_degree": 0,
-            "ktv_color": "",
-            "language": "",
-            "layer_weight": 1,
-            "letter_spacing": 0.0,
-            "line_feed": 1,
-            "line_max_width": 0.82,
-            "line_spacing": 0.02,
-            "multi_language_current": "none",
-            "name": "",
             "original_size": [],
-
-            "preset_category": "",
-            "preset_category_id": "",
-            "preset_has_set_alignment": False,
-            "preset_id": "",
-            "preset_index": 0,
-            "preset_name": "",
-
-            "recognize_task_id": "",
-            "recognize_type": 0,
             "relevance_segment": [],
-
-            "shape_clip_x": False,
-            "shape_clip_y": False,
-            "source_from": "",
-            "style_name": "",
-            "sub_type": 0,
-            "subtitle_keywords": None,
-            "subtitle_template_original_fontsize": 0.0,
             "text_to_audio_ids": [],
-            "tts_auto_update": False,
-            "type": "text",
-
-            "underline_offset": 0.22,
-            "underline_width": 0.05,
-
-            "use_effect_default_color": True,
-            "words": {
-                "end_time": [],
-                "start_time": [],
-                "text": []
-            }
-        }
+            "words": {"end_time": [], "start_time": [], "text": []},
+        })
+        return ret
 
     def export_json(self) -> Dict[str, Any]:
         ret = super().export_json()
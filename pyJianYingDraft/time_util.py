@@ -3,6 +3,8 @@
 from typing import Union
 from typing import Dict
 
+from .export_cache import Exportable
+
 SEC = 1000000
 """一秒=1e6微秒"""
 
@@ -31,12 +33,10 @@ def tim(inp: Union[str, float]) -> int:
 
     return int(round(total_time) * sign)
 
-class Timerange:
+class Timerange(Exportable):
     """记录了起始时间及持续长度的时间范围"""
-    start: int
-    """起始时间, 单位为微秒"""
-    duration: int
-    """持续长度, 单位为微秒"""
+
+    __slots__ = ("_start", "_duration")
 
     def __init__(self, start: int, duration: int):
         """构造一个时间范围
@@ -46,14 +46,32 @@ class Timerange:
             duration (int): 持续长度, 单位为微秒
         """
 
-        self.start = start
-        self.duration = duration
+        self._start = start
+        self._duration = duration
 
     @classmethod
     def import_json(cls, json_obj: Dict[str, str]) -> "Timerange":
         """从json对象中恢复Timerange"""
         return cls(int(json_obj["start"]), int(json_obj["duration"]))
 
+    @property
+    def start(self) -> int:
+        """起始时间, 单位为微秒"""
+        return self._start
+    @start.setter
+    def start(self, value: int):
+        self._start = value
+        self.touch()
+
+    @property
+    def duration(self) -> int:
+        """持续长度, 单位为微秒"""
+        return self._duration
+    @duration.setter
+    def duration(self, value: int):
+        self._duration = value
+        self.touch()
+
     @property
     def end(self) -> int:
         """结束时间, 单位为微秒"""
@@ -1,14 +1,17 @@
 """轨道类及其元数据"""
 
-import uuid
+import bisect
+import itertools
 
 from enum import Enum
 from typing import TypeVar, Generic, Type
-from typing import Dict, List, Any, Union
+from typing import Dict, List, Any, Union, Iterable
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 
 from .exceptions import SegmentOverlap
+from .export_cache import Change_flag, mark_changed
+from .id_provider import new_id
 from .segment import Base_segment
 from .video_segment import Video_segment, Sticker_segment
 from .audio_segment import Audio_segment
@@ -68,26 +71,59 @@ class Base_track(ABC):
     @abstractmethod
     def export_json(self) -> Dict[str, Any]: ...
 
+    def export_json_lazy(self) -> Dict[str, Any]:
+        """与`export_json`相同, 但片段列表可能以生成器的形式给出, 且尽可能复用缓存的导出结果, 供流式写出使用"""
+        return self.export_json()
+
 Seg_type = TypeVar("Seg_type", bound=Base_segment)
+
+def _segment_start(segment: Base_segment) -> int:
+    return segment.target_timerange.start
+
 class Track(Base_track, Generic[Seg_type]):
     """非模板模式下的轨道"""
 
     segments: List[Seg_type]
-    """该轨道包含的片段列表"""
+    """该轨道包含的片段列表, 总是按起始时间排序
+
+    应通过`add_segment`或`extend`添加片段. 修改片段的`start`/`duration`或直接修改此列表后, 轨道会在下次添加或查询片段时重新排序,
+    但不应替换片段的`target_timerange`对象
+    """
+    _starts: List[int]
+    """与`_indexed_segments`一一对应的起始时间列表, 用于二分查找"""
+    _indexed_segments: List[Seg_type]
+    """建立`_starts`时的片段列表对象"""
+    _order_flag: Change_flag
+    """在轨道上任一片段的时间范围被修改时失效"""
+    _disjoint: bool
+    """轨道上的片段是否互不重叠且时长均为正, 否则查找时需逐一检查所有片段
+
+    时长为0的片段不与任何片段重叠, 但会使"起始时间不晚于某时刻的最后一个片段"不再能代表其之前的所有片段
+    """
 
     def __init__(self, track_type: Track_type, name: str, render_index: int):
         self.track_type = track_type
         self.name = name
-        self.track_id = uuid.uuid4().hex
+        self.track_id = new_id()
         self.render_index = render_index
 
         self.segments = []
+        self._starts = []
+        self._indexed_segments = self.segments
+        self._order_flag = Change_flag()
+        self._disjoint = True
+
+    def __len__(self):
+        return len(self.segments)
 
     @property
     def end_time(self) -> int:
         """轨道结束时间, 微秒"""
         if len(self.segments) == 0:
             return 0
+        self._sync()
+        if not self._disjoint:
+            return max(seg.target_timerange.end for seg in self.segments)
         return self.segments[-1].target_timerange.end
 
     @property
@@ -98,6 +134,8 @@ class Track(Base_track, Generic[Seg_type]):
     def add_segment(self, segment: Seg_type) -> "Track[Seg_type]":
         """向轨道中添加一个片段, 添加的片段必须匹配轨道类型且不与现有片段重叠
 
+        片段可以按任意顺序添加, 轨道中的片段总是按起始时间排序
+
         Args:
             segment (Seg_type): 要添加的片段
 
@@ -108,27 +146,105 @@ class Track(Base_track, Generic[Seg_type]):
         if not isinstance(segment, self.accept_segment_type):
             raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (type(segment), self.accept_segment_type))
 
-        # 检查片段是否重叠
-        for seg in self.segments:
-            if seg.overlaps(segment):
+        self._sync()
+        # 轨道上的片段互不重叠且按起始时间排序时, 只需检查插入位置两侧的片段
+        start = segment.target_timerange.start
+        index = bisect.bisect_right(self._starts, start)
+        for neighbor in self.segments[max(index-1, 0):index+1] if self._disjoint else self.segments:
+            if neighbor.overlaps(segment):
                 raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
                                      .format(segment.target_timerange.start, segment.target_timerange.end))
 
-        self.segments.append(segment)
+        self.segments.insert(index, segment)
+        self._starts.insert(index, start)
+        if segment.target_timerange.duration <= 0:
+            self._disjoint = False
+        segment.target_timerange.add_dependent(self._order_flag)
+        mark_changed()
+        return self
+
+    def extend(self, segments: Iterable[Seg_type]) -> "Track[Seg_type]":
+        """向轨道中批量添加片段, 效果与逐个调用`add_segment`相同, 但只需排序并扫描一遍
+
+        任一片段不满足要求时抛出异常, 此时轨道保持不变
+
+        Args:
+            segments (`Iterable[Seg_type]`): 要添加的片段, 可以为任意顺序
+
+        Raises:
+            `TypeError`: 存在与轨道类型不匹配的片段
+            `SegmentOverlap`: 新片段之间或新片段与现有片段重叠
+        """
+        new_segments = list(segments)
+        for seg_type in set(type(seg) for seg in new_segments):
+            if not issubclass(seg_type, self.accept_segment_type):
+                raise TypeError("New segment (%s) is not of the same type as the track (%s)" % (seg_type, self.accept_segment_type))
+
+        self._sync()
+        # 稳定排序保证起始时间相同的片段与逐个添加时的顺序一致
+        merged = sorted(self.segments + new_segments, key=_segment_start)
+        disjoint = all(seg.target_timerange.duration > 0 for seg in merged)
+        # 存在时长为0的片段时, 相邻片段互不重叠并不能说明所有片段互不重叠, 需逐对检查
+        for prev, seg in zip(merged, merged[1:]) if disjoint else itertools.combinations(merged, 2):
+            if prev.overlaps(seg):
+                raise SegmentOverlap("New segment overlaps with existing segment [start: {}, end: {}]"
+                                     .format(seg.target_timerange.start, seg.target_timerange.end))
+
+        self.segments = merged
+        self._starts = [seg.target_timerange.start for seg in merged]
+        self._indexed_segments = merged
+        self._disjoint = disjoint
+        for seg in new_segments:
+            seg.target_timerange.add_dependent(self._order_flag)
+        mark_changed()
         return self
 
+    def _sync(self) -> None:
+        """若片段的时间范围或片段列表在轨道之外被修改, 则重新按起始时间排序, 并重建`_starts`"""
+        if self._order_flag.valid and self._indexed_segments is self.segments and len(self._starts) == len(self.segments):
+            return
+
+        self._order_flag.valid = False  # 使旧的标志能从各时间范围的依赖列表中被清理
+        self._order_flag = Change_flag()
+        self.segments.sort(key=_segment_start)
+        self._starts = [seg.target_timerange.start for seg in self.segments]
+        self._indexed_segments = self.segments
+        self._disjoint = all(seg.target_timerange.duration > 0 for seg in self.segments) \
+            and not any(prev.overlaps(seg) for prev, seg in zip(self.segments, self.segments[1:]))
+        for seg in self.segments:
+            seg.target_timerange.add_dependent(self._order_flag)
+
+    def segments_at(self, time: int) -> List[Seg_type]:
+        """返回在给定时刻处于活动状态(即`start <= time < end`)的片段"""
+        return self.segments_in_range(time, time + 1)
+
+    def segments_in_range(self, start: int, end: int) -> List[Seg_type]:
+        """按起始时间顺序返回与时间范围`[start, end)`有重叠的片段"""
+        self._sync()
+        index = 0
+        if self._disjoint:
+            # 起始时间不晚于start的最后一个片段可能跨越start, 更早的片段均已结束
+            index = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        ret: List[Seg_type] = []
+        while index < len(self.segments) and self._starts[index] < end:
+            if self.segments[index].target_timerange.end > start:
+                ret.append(self.segments[index])
+            index += 1
+        return ret
+
     def export_json(self) -> Dict[str, Any]:
+        ret = self.export_json_lazy()
         # 为每个片段写入render_index
-        segment_exports = [seg.export_json() for seg in self.segments]
-        for seg in segment_exports:
-            seg["render_index"] = self.render_index
+        ret["segments"] = [dict(seg.export_json(), render_index=self.render_index) for seg in self.segments]
+        return ret
 
+    def export_json_lazy(self) -> Dict[str, Any]:
         return {
             "attribute": 0,
             "flag": 0,
             "id": self.track_id,
             "is_default_name": len(self.name) == 0,
             "name": self.name,
-            "segments": segment_exports,
+            "segments": (seg.export_cached(render_index=self.render_index) for seg in self.segments),
             "type": self.track_type.name
         }
@@ -7,6 +7,14 @@ from typing import List, Dict, Any
 
 JsonExportable = Union[int, float, bool, str, List["JsonExportable"], Dict[str, "JsonExportable"]]
 
+def copy_json(data: JsonExportable) -> JsonExportable:
+    """复制由JSON解析得到的数据, 只需复制其中的字典及列表, 比`deepcopy`快得多"""
+    if isinstance(data, dict):
+        return {key: copy_json(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [copy_json(value) for value in data]
+    return data
+
 def provide_ctor_defaults(cls: Type) -> Dict[str, Any]:
     """为构造函数提供默认值，以绕开构造函数的参数限制"""
 
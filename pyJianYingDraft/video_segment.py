@@ -3,15 +3,15 @@
 包含图像调节设置、动画效果、特效、转场等相关类
 """
 
-import uuid
-
 from typing import Optional, Literal, Union
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Sequence
 
+from .export_cache import Exportable
+from .id_provider import new_id
 from .time_util import tim, Timerange
 from .segment import Media_segment, Clip_settings
 from .local_materials import Video_material
-from .keyframe import Keyframe_property, Keyframe_list
+from .keyframe import Keyframe_property
 from .animation import Segment_animations, Video_animation
 
 from .metadata import Effect_meta, Effect_param_instance
@@ -19,7 +19,7 @@ from .metadata import Mask_meta, Mask_type, Filter_type, Transition_type
 from .metadata import Intro_type, Outro_type, Group_animation_type
 from .metadata import Video_scene_effect_type, Video_character_effect_type
 
-class Mask:
+class Mask(Exportable):
     """蒙版对象"""
 
     mask_meta: Mask_meta
@@ -44,7 +44,7 @@ class Mask:
                  cx: float, cy: float, w: float, h: float,
                  ratio: float, rot: float, inv: bool, feather: float, round_corner: float):
         self.mask_meta = mask_meta
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
 
         self.center_x, self.center_y = cx, cy
         self.width, self.height = w, h
@@ -78,7 +78,7 @@ class Mask:
             # 不导出path字段
         }
 
-class Video_effect:
+class Video_effect(Exportable):
     """视频特效素材"""
 
     name: str
@@ -102,7 +102,7 @@ class Video_effect:
         """根据给定的特效元数据及参数列表构造一个视频特效对象, params的范围是0~100"""
 
         self.name = effect_meta.value.name
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_id = effect_meta.value.effect_id
         self.resource_id = effect_meta.value.resource_id
         self.adjust_params = []
@@ -142,7 +142,7 @@ class Video_effect:
             # 不导出path、request_id和algorithm_artifact_path字段
         }
 
-class Filter:
+class Filter(Exportable):
     """滤镜素材"""
 
     global_id: str
@@ -160,7 +160,7 @@ class Filter:
                  apply_target_type: Literal[0, 2] = 0):
         """根据给定的滤镜元数据及强度构造滤镜素材对象"""
 
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_meta = meta
         self.intensity = intensity
         self.apply_target_type = apply_target_type
@@ -199,7 +199,7 @@ class Filter:
             # 不导出path和request_id
         }
 
-class Transition:
+class Transition(Exportable):
     """转场对象"""
 
     name: str
@@ -219,7 +219,7 @@ class Transition:
     def __init__(self, effect_meta: Transition_type, duration: Optional[int] = None):
         """根据给定的转场元数据及持续时间构造一个转场对象"""
         self.name = effect_meta.value.name
-        self.global_id = uuid.uuid4().hex
+        self.global_id = new_id()
         self.effect_id = effect_meta.value.effect_id
         self.resource_id = effect_meta.value.resource_id
 
@@ -244,6 +244,9 @@ class Transition:
 class Video_segment(Media_segment):
     """安放在轨道上的一个视频/图片片段"""
 
+    __slots__ = ("material_size", "clip_settings", "uniform_scale", "effects", "filters",
+                 "animations_instance", "mask", "transition")
+
     material_size: Tuple[int, int]
     """素材尺寸"""
 
@@ -337,6 +340,7 @@ class Video_segment(Media_segment):
         if self.animations_instance is None:
             self.animations_instance = Segment_animations()
             self.extra_material_refs.append(self.animations_instance.animation_id)
+            self.touch()
 
         self.animations_instance.add_animation(Video_animation(animation_type, start, duration))
 
@@ -360,6 +364,7 @@ class Video_segment(Media_segment):
         effect_inst = Video_effect(effect_type, params)
         self.effects.append(effect_inst)
         self.extra_material_refs.append(effect_inst.global_id)
+        self.touch()
 
         return self
 
@@ -373,9 +378,21 @@ class Video_segment(Media_segment):
         filter_inst = Filter(filter_type.value, intensity / 100.0)  # 转化为0~1范围
         self.filters.append(filter_inst)
         self.extra_material_refs.append(filter_inst.global_id)
+        self.touch()
 
         return self
 
+    def _resolve_keyframe_property(self, _property: Keyframe_property) -> Keyframe_property:
+        """处理缩放属性间的互斥关系, 返回关键帧实际对应的属性"""
+        if (_property == Keyframe_property.scale_x or _property == Keyframe_property.scale_y) and self.uniform_scale:
+            self.uniform_scale = False
+            self.touch()
+        elif _property == Keyframe_property.uniform_scale:
+            if not self.uniform_scale:
+                raise ValueError("已设置 scale_x 或 scale_y 时, 不能再设置 uniform_scale")
+            _property = Keyframe_property.scale_x
+        return _property
+
     def add_keyframe(self, _property: Keyframe_property, time_offset: Union[int, str], value: float) -> "Video_segment":
         """为给定属性创建一个关键帧, 并自动加入到关键帧列表中
 
@@ -387,23 +404,24 @@ class Video_segment(Media_segment):
         Raises:
             `ValueError`: 试图同时设置`uniform_scale`以及`scale_x`或`scale_y`其中一者
         """
+        _property = self._resolve_keyframe_property(_property)
+        time_offset = tim(time_offset) if isinstance(time_offset, str) else int(time_offset)  # 兼容NumPy整数等类型
+        self._keyframe_list(_property).add_keyframe(time_offset, value)
+        return self
 
-        if (_property == Keyframe_property.scale_x or _property == Keyframe_property.scale_y) and self.uniform_scale:
-            self.uniform_scale = False
-        elif _property == Keyframe_property.uniform_scale:
-            if not self.uniform_scale:
-                raise ValueError("已设置 scale_x 或 scale_y 时, 不能再设置 uniform_scale")
-            _property = Keyframe_property.scale_x
+    def add_keyframes(self, _property: Keyframe_property, time_offsets: Sequence[int], values: Sequence[float]) -> "Video_segment":
+        """为给定属性批量创建关键帧, 结果与逐个调用`add_keyframe`相同, 但快得多
 
-        if isinstance(time_offset, str): time_offset = tim(time_offset)
+        Args:
+            _property (`Keyframe_property`): 要控制的属性
+            time_offsets (`Sequence[int]`): 各关键帧的时间偏移量, 单位为微秒, 可以为列表或NumPy数组等
+            values (`Sequence[float]`): 属性在各时间偏移量处的值, 长度应与`time_offsets`相同
 
-        for kf_list in self.common_keyframes:
-            if kf_list.keyframe_property == _property:
-                kf_list.add_keyframe(time_offset, value)
-                return self
-        kf_list = Keyframe_list(_property)
-        kf_list.add_keyframe(time_offset, value)
-        self.common_keyframes.append(kf_list)
+        Raises:
+            `ValueError`: 两序列的长度不同, 或试图同时设置`uniform_scale`以及`scale_x`或`scale_y`其中一者
+        """
+        _property = self._resolve_keyframe_property(_property)
+        self._keyframe_list(_property).add_keyframes(time_offsets, values)
         return self
 
     def add_mask(self, mask_type: Mask_type, *, center_x: float = 0.0, center_y: float = 0.0, size: float = 0.5,
@@ -440,6 +458,7 @@ class Video_segment(Media_segment):
                          w=width, h=size, ratio=mask_type.value.default_aspect_ratio,
                          rot=rotation, inv=invert, feather=feather/100, round_corner=round_corner/100)
         self.extra_material_refs.append(self.mask.global_id)
+        self.touch()
         return self
 
     def add_transition(self, transition_type: Transition_type, *, duration: Optional[Union[int, str]] = None) -> "Video_segment":
@@ -458,6 +477,7 @@ class Video_segment(Media_segment):
 
         self.transition = Transition(transition_type, duration)
         self.extra_material_refs.append(self.transition.global_id)
+        self.touch()
         return self
 
     def export_json(self) -> Dict[str, Any]:
@@ -472,6 +492,8 @@ class Video_segment(Media_segment):
 class Sticker_segment(Media_segment):
     """安放在轨道上的一个贴纸片段"""
 
+    __slots__ = ("resource_id", "clip_settings", "uniform_scale")
+
     resource_id: str
     """贴纸资源id"""
 
@@ -493,7 +515,7 @@ class Sticker_segment(Media_segment):
             target_timerange (`Timerange`): 片段在轨道上的目标时间范围
             clip_settings (`Clip_settings`, optional): 图像调节设置, 默认不作任何变换
         """
-        super().__init__(uuid.uuid4().hex, None, target_timerange, 1.0, 1.0)
+        super().__init__(new_id(), None, target_timerange, 1.0, 1.0)
         self.clip_settings = clip_settings or Clip_settings()
         self.uniform_scale = True
         self.resource_id = resource_id
@@ -0,0 +1,30 @@
+import os
+import json
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import Keyframe_property, trange
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "readme_assets", "tutorial")
+
+def test_add_keyframe_numpy_offset():
+    np = pytest.importorskip("numpy")
+    video_segment = draft.Video_segment(draft.Video_material(os.path.join(ASSET_DIR, "video.mp4")), trange("0s", "1s"))
+    audio_segment = draft.Audio_segment(draft.Audio_material(os.path.join(ASSET_DIR, "audio.mp3")), trange("0s", "1s"))
+
+    video_segment.add_keyframe(Keyframe_property.alpha, np.int64(500000), 0.5)
+    audio_segment.add_keyframe(np.int32(250000), 0.8)
+
+    video_kf = video_segment.common_keyframes[Keyframe_property.alpha].keyframes[0]
+    audio_kf = audio_segment.common_keyframes[Keyframe_property.volume].keyframes[0]
+    assert (video_kf.time_offset, type(video_kf.time_offset)) == (500000, int)
+    assert (audio_kf.time_offset, type(audio_kf.time_offset)) == (250000, int)
+    # 导出结果应能被标准库编码
+    json.dumps(video_segment.export_json())
+    json.dumps(audio_segment.export_json())
+
+def test_add_keyframe_str_offset():
+    video_segment = draft.Video_segment(draft.Video_material(os.path.join(ASSET_DIR, "video.mp4")), trange("0s", "1s"))
+    video_segment.add_keyframe(Keyframe_property.alpha, "0.5s", 0.5)
+    assert video_segment.common_keyframes[Keyframe_property.alpha].keyframes[0].time_offset == 500000
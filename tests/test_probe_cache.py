@@ -0,0 +1,32 @@
+import os
+
+import pyJianYingDraft as draft
+from pyJianYingDraft.probe_cache import Probe_cache, Probe_result
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "readme_assets", "tutorial")
+
+def test_put_evicts_least_recently_used(tmp_path):
+    cache = Probe_cache(str(tmp_path / "probe.db"), max_entries=20)
+    paths = []
+    for i in range(50):
+        path = tmp_path / ("f%d" % i)
+        path.write_text("")
+        paths.append(str(path))
+        cache.put(str(path), "video", Probe_result("video", i, 1, 1))
+        assert cache.stats()["entries"] <= 20
+
+    assert cache.get(paths[-1], "video") == Probe_result("video", 49, 1, 1)
+    assert cache.get(paths[0], "video") is None
+
+def test_stats_include_worker_processes(tmp_path):
+    cache = Probe_cache(str(tmp_path / "probe.db"))
+    paths = [os.path.join(ASSET_DIR, "video.mp4"), os.path.join(ASSET_DIR, "sticker.gif")]
+    draft.set_probe_cache(cache)
+    try:
+        draft.load_materials(paths, workers=2, executor="process")
+        draft.load_materials(paths, workers=2, executor="process")
+    finally:
+        draft.set_probe_cache(None)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
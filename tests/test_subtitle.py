@@ -0,0 +1,32 @@
+import pytest
+
+from pyJianYingDraft.subtitle import iter_vtt, Subtitle_error
+
+VTT_WITH_ERRORS = """WEBVTT
+
+1
+00:01.000 --> 00:02.000
+first
+
+bad
+00:05.000 -> 00:06.000
+oops
+
+orphan-id
+
+2
+00:07.000 --> 00:08.000
+second
+""".splitlines(keepends=True)
+
+def test_vtt_identifier_requires_timing_line():
+    errors: list = []
+    cues = list(iter_vtt(VTT_WITH_ERRORS, errors))
+
+    assert [(cue.start, cue.text, cue.line) for cue in cues] == [(1000000, "first\n", 3), (7000000, "second\n", 13)]
+    assert [error.line for error in errors] == [8, 12]
+    assert all(isinstance(error, Subtitle_error) for error in errors)
+
+def test_vtt_malformed_block_raises_without_error_list():
+    with pytest.raises(ValueError, match="line 8"):
+        list(iter_vtt(VTT_WITH_ERRORS))
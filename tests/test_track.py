@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import pyJianYingDraft as draft
+from pyJianYingDraft import Timerange, Track_type
+from pyJianYingDraft.track import Track
+from pyJianYingDraft.exceptions import SegmentOverlap
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "readme_assets", "tutorial")
+
+@pytest.fixture(scope="module")
+def material() -> draft.Video_material:
+    return draft.Video_material(os.path.join(ASSET_DIR, "video.mp4"))
+
+def make_segment(material: draft.Video_material, start: int, duration: int) -> draft.Video_segment:
+    # 时长为0的片段无法直接构造, 故先构造再修改其时长
+    segment = draft.Video_segment(material, Timerange(start, max(duration, 1)))
+    segment.target_timerange.duration = duration
+    return segment
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_zero_duration_segment_does_not_hide_overlap(material, batch):
+    track = Track(Track_type.video, "", 0)
+    long_seg, zero_seg = make_segment(material, 1, 8), make_segment(material, 1, 0)
+    if batch:
+        track.extend([long_seg, zero_seg])
+    else:
+        track.add_segment(long_seg).add_segment(zero_seg)
+
+    with pytest.raises(SegmentOverlap):
+        track.add_segment(make_segment(material, 4, 3))
+    with pytest.raises(SegmentOverlap):
+        track.extend([make_segment(material, 4, 3)])
+    assert track.segments_at(5) == [long_seg]
+    assert track.segments_in_range(2, 20) == [long_seg]
+    assert track.end_time == 9
+
+def test_zero_duration_segment_after_retiming(material):
+    track = Track(Track_type.video, "", 0)
+    long_seg, short_seg = make_segment(material, 1, 8), make_segment(material, 20, 5)
+    track.extend([long_seg, short_seg])
+
+    short_seg.target_timerange.start = 1
+    short_seg.target_timerange.duration = 0
+    assert track.segments_at(5) == [long_seg]
+    with pytest.raises(SegmentOverlap):
+        track.add_segment(make_segment(material, 4, 3))